@@ -1,22 +1,43 @@
+import asyncio
+from typing import Union
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from models.schemas import (
     LLMRequest, 
     SequentialResponse, 
     ParallelResponse, 
-    SectionIdentificationResponse
+    LongFormResponse,
+    SectionIdentificationResponse,
+    BatchRequest,
+    ClassifyBatchRequest,
+    SectionRegenerationRequest,
+    SectionRegenerationResponse
 )
 from services.sequential_generator import sequential_generator
 from services.parallel_generator import parallel_generator
 from services.performance_analyzer import performance_analyzer
 from services.section_identifier import section_identifier
-from services.query_classifier import query_classifier, QueryType
+from services.query_classifier import query_classifier, QueryType, QueryAnalysis
 from services.simple_responder import simple_responder
+from services.batch_generator import batch_generator
+from services.fair_scheduler import fair_scheduler
+from services.model_stats import model_stats
+from services.section_retry import section_retry_policy
+from services.session_store import session_store
+from services.run_store import run_store, GROUP_BY_COLUMNS
+from services.openai_client import get_openai_client
+from services.request_context import RequestContext, set_request_context
 
 router = APIRouter()
 
+def _bind_request_context(request: LLMRequest) -> None:
+    """Tag every LLM call made for this request with its priority and tenant"""
+    set_request_context(RequestContext(priority=request.priority, tenant_id=request.tenant_id))
+
 @router.post("/generate/sequential", response_model=SequentialResponse)
 async def generate_sequential_response(request: LLMRequest):
     """Generate response using traditional sequential approach"""
+    _bind_request_context(request)
     try:
         # Check if this is a simple query that can be handled without LLM
         query_type, reasoning = query_classifier.classify_query(request.question)
@@ -36,17 +57,79 @@ async def generate_sequential_response(request: LLMRequest):
 @router.post("/generate/parallel", response_model=ParallelResponse)
 async def generate_parallel_response(request: LLMRequest):
     """Generate response using parallel section-based approach"""
+    _bind_request_context(request)
     try:
         # Always use parallel generation when this endpoint is called
         # This is the core feature of ParaGen - let users decide when to use it
         response = await parallel_generator.generate_parallel_response(request.question)
+        response.session_id = session_store.save(request.question, response)
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/generate/long-form", response_model=LongFormResponse)
+async def generate_long_form_response(request: LLMRequest):
+    """Generate a long-form response using hierarchical section decomposition"""
+    _bind_request_context(request)
+    try:
+        response = await parallel_generator.generate_long_form_response(
+            request.question,
+            target_words=request.target_words
+        )
+        response.session_id = session_store.save(request.question, response)
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/generate/batch")
+async def generate_batch_response(request: BatchRequest):
+    """Generate responses for many questions, streamed as NDJSON in completion order"""
+    async def stream_results():
+        async for result in batch_generator.stream_batch(
+            request.items,
+            context=RequestContext(priority=request.priority, tenant_id=request.tenant_id)
+        ):
+            yield result.json() + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.get("/sessions/{session_id}", response_model=Union[LongFormResponse, ParallelResponse])
+async def get_session(session_id: str):
+    """Return the current response of a generation session"""
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found or expired")
+    return session.response
+
+@router.post(
+    "/sessions/{session_id}/sections/{section_index}/regenerate",
+    response_model=SectionRegenerationResponse
+)
+async def regenerate_section(session_id: str, section_index: int, request: SectionRegenerationRequest):
+    """Regenerate or resize one section of a stored response and reassemble the answer"""
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found or expired")
+    if not 0 <= section_index < len(session.response.sections):
+        raise HTTPException(
+            status_code=400,
+            detail=f"section_index must be between 0 and {len(session.response.sections) - 1}"
+        )
+    
+    set_request_context(RequestContext(priority=request.priority, tenant_id=request.tenant_id))
+    try:
+        return await parallel_generator.regenerate_section(
+            session,
+            section_index,
+            target_words=request.target_words
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/analyze/sections", response_model=SectionIdentificationResponse)
 async def analyze_sections(request: LLMRequest):
     """Identify sections for a given question"""
+    _bind_request_context(request)
     try:
         response, _ = await section_identifier.identify_sections(request.question)
         return response
@@ -56,17 +139,19 @@ async def analyze_sections(request: LLMRequest):
 @router.post("/compare/performance")
 async def compare_performance(request: LLMRequest):
     """Run performance comparison between sequential and parallel approaches"""
+    _bind_request_context(request)
     try:
         # Check if this query is worth comparing
-        query_type, reasoning = query_classifier.classify_query(request.question)
+        classification = query_classifier.analyze(request.question)
+        query_type = classification.query_type
         
         if query_type != QueryType.COMPLEX_QUERY:
             return {
                 "message": "Simple query detected - parallel generation not beneficial",
                 "query_type": query_type.value,
-                "reasoning": reasoning,
+                "reasoning": classification.reasoning,
                 "recommendation": "Use sequential generation for simple queries like this",
-                "estimated_sections": query_classifier.estimate_sections_needed(request.question),
+                "estimated_sections": classification.estimated_sections,
                 "simple_response": simple_responder.generate_simple_response(request.question) if query_type == QueryType.SIMPLE_QUESTION else simple_responder.generate_greeting_response()
             }
         
@@ -79,8 +164,8 @@ async def compare_performance(request: LLMRequest):
             "analysis": analysis,
             "query_classification": {
                 "type": query_type.value,
-                "reasoning": reasoning,
-                "estimated_sections": query_classifier.estimate_sections_needed(request.question)
+                "reasoning": classification.reasoning,
+                "estimated_sections": classification.estimated_sections
             }
         }
     except Exception as e:
@@ -91,31 +176,87 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "Parallel LLM API is running"}
 
+@router.get("/stats/queues")
+async def get_queue_stats():
+    """Per-priority queue wait times and throughput of LLM calls"""
+    return fair_scheduler.get_stats()
+
+@router.get("/stats/models")
+async def get_model_stats():
+    """Latency and token usage of LLM calls per model and per pipeline stage"""
+    return model_stats.get_stats()
+
+@router.get("/stats/retries")
+async def get_retry_stats():
+    """Section retries and how often failed sections were salvaged into partial responses"""
+    return section_retry_policy.get_stats()
+
+@router.get("/stats/sessions")
+async def get_session_stats():
+    """Size, hit rate and evictions of the generation session store"""
+    return session_store.get_stats()
+
+@router.get("/stats/endpoints")
+async def get_endpoint_stats():
+    """Traffic share, latency and health of each OpenAI endpoint"""
+    try:
+        return get_openai_client().pool.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/runs/stats")
+async def get_run_stats(hours: float = 24, group_by: str = "strategy"):
+    """Aggregate latency and usage of recorded runs over a time window"""
+    if group_by not in GROUP_BY_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(GROUP_BY_COLUMNS)}")
+    try:
+        aggregates = await asyncio.to_thread(run_store.query_aggregates, hours, group_by)
+        aggregates["store"] = run_store.get_stats()
+        return aggregates
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/classify/query")
 async def classify_query(request: LLMRequest):
     """Classify query complexity and recommend approach"""
     try:
-        query_type, reasoning = query_classifier.classify_query(request.question)
-        estimated_sections = query_classifier.estimate_sections_needed(request.question)
-        should_parallel = query_classifier.should_use_parallel_generation(request.question)
-        
+        classification = query_classifier.analyze(request.question)
+        return _classification_result(request.question, classification)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/classify/batch")
+async def classify_batch(request: ClassifyBatchRequest):
+    """Classify many queries in one call"""
+    try:
+        classifications = query_classifier.analyze_batch(request.questions)
         return {
-            "question": request.question,
-            "classification": {
-                "type": query_type.value,
-                "reasoning": reasoning,
-                "should_use_parallel": should_parallel,
-                "estimated_sections": estimated_sections
-            },
-            "recommendations": {
-                "best_approach": "parallel" if should_parallel else "sequential",
-                "expected_speedup": "2-5x" if should_parallel else "N/A (simple query)",
-                "bypass_llm": simple_responder.should_bypass_llm(request.question, query_type)
-            }
+            "results": [
+                _classification_result(question, classification)
+                for question, classification in zip(request.questions, classifications)
+            ]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _classification_result(question: str, classification: QueryAnalysis) -> dict:
+    """Shape a query analysis into the classification response"""
+    should_parallel = classification.should_use_parallel
+    return {
+        "question": question,
+        "classification": {
+            "type": classification.query_type.value,
+            "reasoning": classification.reasoning,
+            "should_use_parallel": should_parallel,
+            "estimated_sections": classification.estimated_sections
+        },
+        "recommendations": {
+            "best_approach": "parallel" if should_parallel else "sequential",
+            "expected_speedup": "2-5x" if should_parallel else "N/A (simple query)",
+            "bypass_llm": simple_responder.should_bypass_llm(question, classification.query_type)
+        }
+    }
+
 @router.get("/stats")
 async def get_stats():
     """Get API statistics and capabilities"""
@@ -124,18 +265,37 @@ async def get_stats():
         "features": {
             "sequential_generation": True,
             "parallel_generation": True,
+            "long_form_generation": True,
+            "batch_generation": True,
             "section_identification": True,
             "performance_comparison": True,
             "query_classification": True,
-            "intelligent_routing": True
+            "intelligent_routing": True,
+            "priority_scheduling": True,
+            "run_history": True,
+            "model_tiering": True,
+            "endpoint_load_balancing": True,
+            "section_retry_and_salvage": True,
+            "section_regeneration": True
         },
         "llm_provider": "Azure OpenAI",
         "supported_operations": [
             "/generate/sequential",
             "/generate/parallel", 
+            "/generate/long-form",
+            "/generate/batch",
+            "/sessions/{session_id}",
+            "/sessions/{session_id}/sections/{section_index}/regenerate",
             "/analyze/sections",
             "/compare/performance",
-            "/classify/query"
+            "/classify/query",
+            "/classify/batch",
+            "/stats/queues",
+            "/stats/models",
+            "/stats/endpoints",
+            "/stats/retries",
+            "/stats/sessions",
+            "/runs/stats"
         ],
         "intelligence": {
             "simple_greeting_detection": True,
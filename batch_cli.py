@@ -0,0 +1,223 @@
+"""
+Offline batch generation over JSONL question files.
+
+Each input line is a JSON object holding a question (or a title and body).
+Results are appended to the output JSONL as they complete, and items already
+answered there are skipped, so an interrupted job resumes where it stopped:
+
+    python batch_cli.py questions.jsonl answers.jsonl --strategy parallel --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Iterator, Optional, Set, Tuple
+from models.schemas import BatchItem, BatchItemResult, GenerationStrategy, RequestPriority
+from services.batch_generator import batch_generator
+from services.metrics import summarize_latencies
+from services.request_context import RequestContext, set_request_context
+from services.run_store import run_store
+
+class BatchProgress:
+    """Live throughput and end-of-run latency summary"""
+
+    def __init__(self, skipped: int):
+        self.start_time = time.time()
+        self.skipped = skipped
+        self.completed = 0
+        self.errors = 0
+        self.tokens = 0
+        self.latencies_ms = []
+
+    def record(self, result: BatchItemResult) -> None:
+        self.completed += 1
+        self.latencies_ms.append(result.generation_time_ms)
+        if result.status != "ok":
+            self.errors += 1
+        elif result.result is not None:
+            self.tokens += result.result.prompt_tokens + result.result.completion_tokens
+
+    def report(self) -> str:
+        elapsed = max(time.time() - self.start_time, 1e-9)
+        return (
+            f"[batch] {self.completed} done ({self.errors} errors, {self.skipped} skipped) | "
+            f"{self.completed * 60 / elapsed:.1f} questions/min | "
+            f"{self.tokens / elapsed:.1f} tokens/s"
+        )
+
+    def summary(self) -> dict:
+        elapsed = time.time() - self.start_time
+        return {
+            "completed": self.completed,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 2),
+            "questions_per_minute": round(self.completed * 60 / elapsed, 2) if elapsed else 0.0,
+            "tokens_per_second": round(self.tokens / elapsed, 2) if elapsed else 0.0,
+            "latency": summarize_latencies(self.latencies_ms)
+        }
+
+def item_key(record: dict, line_number: int, id_field: Optional[str]) -> str:
+    """Stable identifier of an input item, used to skip finished work on resume"""
+    for field in ([id_field] if id_field else ["id", "request_id"]):
+        if record.get(field) is not None:
+            return str(record[field])
+    return f"line:{line_number}"
+
+def item_question(record: dict, question_field: str) -> Optional[str]:
+    """The question of an input item; title and body are joined when there is no question field"""
+    if record.get(question_field):
+        return str(record[question_field])
+    parts = [str(record[field]) for field in ("title", "body") if record.get(field)]
+    return "\n\n".join(parts) if parts else None
+
+def load_completed_keys(output_path: str) -> Set[str]:
+    """Keys of items already answered successfully in a previous run"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as output_file:
+        for line in output_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A partially written last line from a killed run
+                continue
+            if record.get("status") == "ok" and record.get("id") is not None:
+                completed.add(record["id"])
+    return completed
+
+def terminate_partial_line(output_path: str) -> None:
+    """Make sure appended results do not run into a line cut short by a killed run"""
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return
+    with open(output_path, "rb+") as output_file:
+        output_file.seek(-1, os.SEEK_END)
+        if output_file.read(1) != b"\n":
+            output_file.write(b"\n")
+
+def iter_pending_items(
+    input_path: str,
+    completed: Set[str],
+    args: argparse.Namespace
+) -> Iterator[Tuple[int, str, BatchItem]]:
+    """Stream items from the input file that still need an answer"""
+    with open(input_path, encoding="utf-8") as input_file:
+        for line_number, line in enumerate(input_file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"[batch] skipping malformed line {line_number}", file=sys.stderr)
+                continue
+
+            key = item_key(record, line_number, args.id_field)
+            if key in completed:
+                continue
+            question = item_question(record, args.question_field)
+            if not question:
+                print(f"[batch] skipping line {line_number}: no question", file=sys.stderr)
+                continue
+
+            try:
+                item = BatchItem(
+                    question=question,
+                    strategy=record.get("strategy") or args.strategy,
+                    target_words=record.get("target_words") or args.target_words,
+                    id=key
+                )
+            except ValueError as e:
+                print(f"[batch] skipping line {line_number}: {str(e)}", file=sys.stderr)
+                continue
+            yield line_number, key, item
+
+async def run_batch(args: argparse.Namespace) -> dict:
+    set_request_context(RequestContext(priority=RequestPriority(args.priority), tenant_id=args.tenant_id))
+
+    completed = load_completed_keys(args.output)
+    terminate_partial_line(args.output)
+    progress = BatchProgress(skipped=len(completed))
+    if completed:
+        print(f"[batch] resuming: {len(completed)} items already answered", file=sys.stderr)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    tasks = set()
+
+    with open(args.output, "a", encoding="utf-8") as output_file:
+
+        async def process(line_number: int, item: BatchItem) -> None:
+            start_time = time.time()
+            result, error = None, None
+            try:
+                result = await batch_generator.generate_item(item)
+            except Exception as e:
+                error = str(e)
+            finally:
+                semaphore.release()
+
+            item_result = BatchItemResult(
+                index=line_number,
+                id=item.id,
+                question=item.question,
+                strategy=item.strategy,
+                status="error" if error else "ok",
+                queue_wait_ms=0.0,
+                generation_time_ms=(time.time() - start_time) * 1000,
+                result=result,
+                error=error
+            )
+            # One complete line per item so a killed run leaves a resumable file
+            output_file.write(item_result.json() + "\n")
+            output_file.flush()
+            progress.record(item_result)
+
+        async def report_progress() -> None:
+            while True:
+                await asyncio.sleep(args.progress_interval)
+                os.fsync(output_file.fileno())
+                print(progress.report(), file=sys.stderr)
+
+        reporter = asyncio.create_task(report_progress())
+        try:
+            for line_number, _, item in iter_pending_items(args.input, completed, args):
+                # Backpressure: read the next line only when a slot is free
+                await semaphore.acquire()
+                task = asyncio.create_task(process(line_number, item))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            reporter.cancel()
+
+    return progress.summary()
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate answers for a JSONL file of questions")
+    parser.add_argument("input", help="Input JSONL file, one question object per line")
+    parser.add_argument("output", help="Output JSONL file; appended to and used to resume")
+    parser.add_argument("--strategy", default=GenerationStrategy.PARALLEL.value,
+                        choices=[strategy.value for strategy in GenerationStrategy], help="Default generation strategy")
+    parser.add_argument("--target-words", type=int, default=None, help="Target length for long_form items")
+    parser.add_argument("--concurrency", type=int, default=16, help="Questions generated at once")
+    parser.add_argument("--question-field", default="question", help="Field holding the question")
+    parser.add_argument("--id-field", default=None, help="Field holding the item id (default: id or request_id)")
+    parser.add_argument("--priority", default=RequestPriority.BULK.value,
+                        choices=[priority.value for priority in RequestPriority], help="Scheduling class for LLM calls")
+    parser.add_argument("--tenant-id", default="batch-cli", help="Tenant used for fair queuing")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="Seconds between progress lines")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    try:
+        summary = asyncio.run(run_batch(args))
+    finally:
+        run_store.close()
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
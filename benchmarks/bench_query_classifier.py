@@ -0,0 +1,127 @@
+"""
+Micro-benchmark for the query classification engine.
+
+Run from the repository root:
+    python -m benchmarks.bench_query_classifier
+
+To compare against an earlier classifier, export its module and pass it in:
+    git show <rev>:services/query_classifier.py > /tmp/legacy_query_classifier.py
+    python -m benchmarks.bench_query_classifier --legacy-module /tmp/legacy_query_classifier.py
+"""
+import argparse
+import importlib.util
+import os
+import random
+import time
+from typing import Callable, List, Optional
+from services.query_classifier import QueryClassifier
+
+VOCABULARY = [
+    "explain", "the", "architecture", "of", "kubernetes", "and", "how", "to",
+    "install", "setup", "guide", "benefits", "what", "why", "when", "database",
+    "cache", "design", "best", "practices", "considerations", "approaches",
+    "compare", "python", "rust", "deployment", "for", "a", "small", "team",
+    "understand", "latency", "in", "distributed", "systems", "tradeoffs"
+]
+
+SHORT_QUESTIONS = [
+    "hi", "hello there", "good morning", "what is python?", "thanks",
+    "How are you?", "what's up", "ping"
+]
+
+def generate_questions(count: int, seed: int = 0) -> List[str]:
+    """Deterministic mix of greetings, short questions and long complex queries"""
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        if rng.random() < 0.1:
+            questions.append(rng.choice(SHORT_QUESTIONS))
+        else:
+            words = [rng.choice(VOCABULARY) for _ in range(rng.randint(3, 35))]
+            questions.append(f"{' '.join(words)} {i}?")
+    return questions
+
+def time_per_question(fn: Callable[[], object], count: int) -> float:
+    """Microseconds per question for one call of fn over count questions"""
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) / count * 1e6
+
+def load_legacy_classifier(path: str):
+    """Instantiate the QueryClassifier defined in a standalone module file"""
+    spec = importlib.util.spec_from_file_location("legacy_query_classifier", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.QueryClassifier()
+
+def run(sizes: List[int], legacy_module: Optional[str] = None) -> None:
+    default_cache_size = int(os.getenv("PARAGEN_CLASSIFIER_CACHE_SIZE", "4096"))
+
+    for size in sizes:
+        questions = generate_questions(size)
+
+        classifier = QueryClassifier()
+        cold = time_per_question(lambda: [classifier.analyze(q) for q in questions], size)
+        repeated = time_per_question(lambda: [classifier.analyze(q) for q in questions], size)
+
+        # Memoization with a cache large enough to hold the whole question set
+        os.environ["PARAGEN_CLASSIFIER_CACHE_SIZE"] = str(size)
+        try:
+            classifier = QueryClassifier()
+        finally:
+            os.environ["PARAGEN_CLASSIFIER_CACHE_SIZE"] = str(default_cache_size)
+        [classifier.analyze(q) for q in questions]
+        memoized = time_per_question(lambda: [classifier.analyze(q) for q in questions], size)
+
+        classifier = QueryClassifier()
+        batch = time_per_question(lambda: classifier.analyze_batch(questions), size)
+
+        # Three uncached analyses, as a route without memoization would pay
+        classifier = QueryClassifier()
+        uncached_route = time_per_question(
+            lambda: [
+                (
+                    classifier._analyze(q),
+                    classifier._analyze(q),
+                    classifier._analyze(q)
+                )
+                for q in questions
+            ],
+            size
+        )
+
+        repeated_label = "analyze (second pass)"
+        if size > default_cache_size:
+            # The default cache is smaller than the question set
+            repeated_label = f"analyze (thrashing, {default_cache_size})"
+
+        print(f"{size:>8} questions")
+        print(f"    analyze (first sight)      {cold:8.2f} us/question")
+        print(f"    {repeated_label:<27}{repeated:8.2f} us/question")
+        print(f"    analyze (memoized)         {memoized:8.2f} us/question")
+        print(f"    analyze_batch              {batch:8.2f} us/question")
+        print(f"    3x uncached _analyze       {uncached_route:8.2f} us/question")
+
+        if legacy_module:
+            # What /classify/query paid with the legacy classifier: three separate classifications
+            legacy = load_legacy_classifier(legacy_module)
+            legacy_route = time_per_question(
+                lambda: [
+                    (
+                        legacy.classify_query(q),
+                        legacy.estimate_sections_needed(q),
+                        legacy.should_use_parallel_generation(q)
+                    )
+                    for q in questions
+                ],
+                size
+            )
+            print(f"    legacy /classify/query     {legacy_route:8.2f} us/question")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark query classification")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--legacy-module", default=None,
+                        help="Path to an earlier query_classifier.py to benchmark the old /classify/query path")
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_module)
@@ -0,0 +1,84 @@
+"""
+In-process stand-in for the OpenAI SDK that answers instantly.
+
+Installing it swaps the SDK client of every endpoint in a real OpenAIClient,
+so scheduling, endpoint selection, stream consumption and usage accounting
+still run; only the network round trip is gone.
+"""
+import os
+from types import SimpleNamespace
+from services import openai_client as openai_client_module
+
+SECTION_PLAN = "\n".join([
+    "Introduction,100",
+    "Core Concepts,200",
+    "Implementation Steps,250",
+    "Best Practices,150",
+    "Conclusion,100"
+])
+
+SECTION_SENTENCE = "This sentence stands in for generated section content and has twelve words. "
+
+class FakeStream:
+    """Async iterator of one-word content chunks followed by a usage chunk"""
+
+    def __init__(self, words, usage):
+        self._words = words
+        self._usage = usage
+        self._index = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._index < len(self._words):
+            word = self._words[self._index]
+            self._index += 1
+            return SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=word), finish_reason=None)],
+                usage=None
+            )
+        if self._index == len(self._words):
+            self._index += 1
+            return SimpleNamespace(choices=[], usage=self._usage)
+        raise StopAsyncIteration
+
+    async def close(self) -> None:
+        pass
+
+class FakeCompletions:
+    """chat.completions with a section plan for planning prompts and filler text otherwise"""
+
+    def __init__(self, section_words: int = 200):
+        sentences = SECTION_SENTENCE * (section_words // 12 + 1)
+        self.section_words = [f"{word} " for word in sentences.split()]
+        self.section_text = "".join(self.section_words)
+        self.calls = 0
+
+    async def create(self, model, messages, max_tokens=None, temperature=None, stream=False, **kwargs):
+        self.calls += 1
+        prompt = messages[0]["content"]
+        text = SECTION_PLAN if "CSV" in prompt else self.section_text
+        usage = SimpleNamespace(
+            prompt_tokens=len(prompt) // 4,
+            completion_tokens=len(text.split()),
+            total_tokens=len(prompt) // 4 + len(text.split())
+        )
+        if stream:
+            return FakeStream(self.section_words, usage)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text), finish_reason="stop")],
+            usage=usage
+        )
+
+def install(section_words: int = 200) -> FakeCompletions:
+    """Make get_openai_client() return a client whose endpoints all answer instantly"""
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("OPENAI_ENDPOINT", "http://localhost")
+
+    completions = FakeCompletions(section_words)
+    client = openai_client_module.OpenAIClient()
+    for endpoint in client.pool.endpoints:
+        endpoint.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    openai_client_module.openai_client = client
+    return completions
@@ -0,0 +1,307 @@
+"""
+CPU-side benchmark and regression suite for ParaGen's per-request hot paths.
+
+Every case runs without network access; the end-to-end cases drive the real
+generators against an in-process LLM that answers instantly (see
+benchmarks/fake_llm.py), so their timings are pure framework overhead.
+
+Run from the repository root:
+    python -m benchmarks.run run                 # print timings
+    python -m benchmarks.run run --save          # store them as the baseline
+    python -m benchmarks.run compare             # flag regressions against the baseline
+
+Cases are timed in interleaved rounds after a warmup, with shared state
+reset before every timing. Each round also times a fixed calibration
+workload, and every case is compared as a multiple of the calibration time
+from its own round, so drift in machine speed cancels out. A slowdown only
+counts as a regression when it exceeds the threshold (15% by default) or,
+for a case that was noisy when its baseline was saved, three times the
+baseline's median absolute deviation across rounds, whichever is larger.
+The noise allowance is capped (25% by default), so no case may slow down
+by more than that unflagged; compare prints each case's allowance.
+Baselines are machine specific: re-save them on the machine you compare on.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+from models.schemas import (
+    GeneratedSection,
+    ParallelResponse,
+    PerformanceComparison,
+    SequentialResponse
+)
+from prompts.advanced_prompts import get_section_prompt
+from services.parallel_generator import parallel_generator
+from services.performance_analyzer import performance_analyzer
+from services.query_classifier import QueryClassifier
+from services.run_store import run_store
+from services.section_identifier import section_identifier
+from services.sequential_generator import sequential_generator
+from services.session_store import session_store
+from benchmarks import fake_llm
+from benchmarks.bench_query_classifier import generate_questions
+
+# Slowdowns within this many baseline noise spreads are not regressions
+NOISE_SPREADS = 3
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+QUESTION = "Explain the architecture of Kubernetes and the best practices for deploying it on a small team"
+
+SECTION_CSV = "\n".join([
+    "Introduction to Kubernetes,100",
+    "\"Control Plane, Nodes and Pods\",200",
+    "Installation and Setup Guide,250",
+    "Networking Architecture,200",
+    "Best Practices and Recommendations,150",
+    "Conclusion,100"
+])
+
+SECTION_HEADINGS = [
+    "Introduction to Kubernetes",
+    "Installation and Setup Guide",
+    "Networking Architecture",
+    "Best Practices and Recommendations",
+    "Conclusion"
+]
+
+def make_sections(count: int = 6, words: int = 150) -> List[GeneratedSection]:
+    content = " ".join(["word"] * words)
+    return [
+        GeneratedSection(
+            heading=f"Section {i}",
+            content=content,
+            word_count=words,
+            generation_time_ms=1200.0 + i,
+            target_words=words,
+            prompt_tokens=250,
+            completion_tokens=words,
+            model="gpt-4.1-mini"
+        )
+        for i in range(1, count + 1)
+    ]
+
+def make_comparison() -> PerformanceComparison:
+    sections = make_sections()
+    return PerformanceComparison(
+        question=QUESTION,
+        sequential_response=SequentialResponse(
+            answer="word " * 900,
+            generation_time_ms=9000.0,
+            word_count=900,
+            timestamp=datetime.now()
+        ),
+        parallel_response=ParallelResponse(
+            answer=parallel_generator._assemble_response(sections),
+            sections=sections,
+            total_generation_time_ms=2500.0,
+            section_identification_time_ms=800.0,
+            parallel_generation_time_ms=1700.0,
+            word_count=sum(section.word_count for section in sections),
+            timestamp=datetime.now()
+        ),
+        speedup_factor=3.6,
+        time_saved_ms=6500.0,
+        timestamp=datetime.now()
+    )
+
+class Timing(NamedTuple):
+    """Per-round medians of a case, absolute and relative to the calibration workload"""
+    median_us: float
+    relative: float
+    relative_mad: float
+
+def calibration_workload() -> object:
+    """Fixed pure-Python work that tracks the interpreter's current speed"""
+    table = {f"key-{i}": [i, i * 7 % 13] for i in range(200)}
+    return sorted(table.items(), key=lambda item: (item[1][1], item[0]))
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    """Benchmark cases by name; each callable is one operation"""
+    sections = make_sections()
+    section_dicts = [section.dict() for section in sections]
+    comparison = make_comparison()
+    parallel_response = comparison.parallel_response
+    questions = generate_questions(1000)
+    classifier = QueryClassifier()
+
+    # End-to-end requests go through the real client with an instant fake LLM
+    fake_llm.install()
+    run_store.enabled = False
+    loop = asyncio.new_event_loop()
+
+    def classify_first_sight():
+        # Start from an empty token table and memo so every question is new
+        classifier._keyword_matcher._token_matches.clear()
+        classifier._analyze_cached.cache_clear()
+        for question in questions:
+            classifier.analyze(question)
+
+    def classify_memoized():
+        for question in questions:
+            classifier.analyze(question)
+
+    return {
+        "parse_sections": lambda: section_identifier._parse_sections(SECTION_CSV),
+        "get_section_prompt": lambda: [
+            get_section_prompt(heading, QUESTION, 200) for heading in SECTION_HEADINGS
+        ],
+        "classify_1000_first_sight": classify_first_sight,
+        "classify_1000_memoized": classify_memoized,
+        "assemble_response": lambda: parallel_generator._assemble_response(sections),
+        "analyze_performance_metrics": lambda: performance_analyzer.analyze_performance_metrics(comparison),
+        "pydantic_generated_sections": lambda: [GeneratedSection(**data) for data in section_dicts],
+        "pydantic_parallel_response_json": parallel_response.json,
+        "e2e_sequential": lambda: loop.run_until_complete(
+            sequential_generator.generate_sequential_response(QUESTION)
+        ),
+        "e2e_parallel": lambda: loop.run_until_complete(
+            parallel_generator.generate_parallel_response(QUESTION)
+        )
+    }
+
+def reset_shared_state() -> None:
+    """Drop state that builds up across calls so every repeat starts alike"""
+    session_store._sessions.clear()
+    run_store._pending.clear()
+    gc.collect()
+
+def run_cases(name_filter: Optional[str], repeat: int) -> Dict[str, Timing]:
+    cases = {
+        name: fn for name, fn in build_cases().items()
+        if not name_filter or name_filter in name
+    }
+
+    # Size each timing to about 100ms and warm every case up once
+    timers = {}
+    for name, fn in [("calibration", calibration_workload)] + list(cases.items()):
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        number = max(number // 2, 1)
+        timer.timeit(number)
+        timers[name] = (timer, number)
+
+    samples: Dict[str, List[float]] = {name: [] for name in timers}
+    for _ in range(repeat):
+        for name, (timer, number) in timers.items():
+            reset_shared_state()
+            samples[name].append(timer.timeit(number) / number * 1e6)
+
+    results = {}
+    for name in cases:
+        relative = [sample / calibration for sample, calibration in zip(samples[name], samples["calibration"])]
+        relative_median = statistics.median(relative)
+        results[name] = Timing(
+            median_us=statistics.median(samples[name]),
+            relative=relative_median,
+            relative_mad=statistics.median(abs(value - relative_median) for value in relative)
+        )
+        print(
+            f"{name:<36} {results[name].median_us:12.2f} us/op "
+            f"{results[name].relative:10.4f} x calibration +/- {results[name].relative_mad:.4f}",
+            file=sys.stderr
+        )
+    return results
+
+def load_baseline(path: str) -> dict:
+    with open(path, encoding="utf-8") as baseline_file:
+        return json.load(baseline_file)
+
+def save_baseline(path: str, results: Dict[str, Timing], merge: bool = False) -> None:
+    cases = {
+        name: {
+            "median_us": round(timing.median_us, 3),
+            "relative": round(timing.relative, 6),
+            "relative_mad": round(timing.relative_mad, 6)
+        }
+        for name, timing in results.items()
+    }
+    if merge and os.path.exists(path):
+        # A filtered run only replaces the cases it measured
+        cases = {**load_baseline(path).get("cases", {}), **cases}
+    baseline = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": cases
+    }
+    with open(path, "w", encoding="utf-8") as baseline_file:
+        json.dump(baseline, baseline_file, indent=2)
+        baseline_file.write("\n")
+
+def compare(results: Dict[str, Timing], baseline: dict, threshold: float, max_allowance: float) -> List[str]:
+    """Print a comparison table and return the names of regressed cases"""
+    baseline_cases = baseline.get("cases", {})
+    regressions = []
+
+    print(f"{'case':<36} {'baseline':>12} {'current':>12} {'change':>9} {'allowed':>9}")
+    for name, current in results.items():
+        previous = baseline_cases.get(name)
+        if previous is None:
+            print(f"{name:<36} {'-':>12} {current.median_us:12.2f} {'new':>9}")
+            continue
+        # Changes are judged on calibration-relative timings; absolute ones are for reading
+        change = current.relative / previous["relative"] - 1
+        # Only the stored baseline widens the allowance, so a noisy run cannot excuse itself
+        noise = NOISE_SPREADS * previous["relative_mad"] / previous["relative"]
+        allowed = max(threshold, min(noise, max_allowance))
+        flag = ""
+        if change > allowed:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<36} {previous['median_us']:12.2f} {current.median_us:12.2f} "
+            f"{change:+8.1%} {allowed:8.1%}{flag}"
+        )
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ParaGen's CPU-side hot paths")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and print timings")
+    run_parser.add_argument("--save", action="store_true", help="Store the timings as the new baseline")
+
+    compare_parser = subparsers.add_parser("compare", help="Run the benchmarks and compare with the baseline")
+    compare_parser.add_argument("--threshold", type=float, default=0.15,
+                                help="Smallest relative slowdown reported as a regression (default 0.15 = 15%%)")
+    compare_parser.add_argument("--max-allowance", type=float, default=0.25,
+                                help="Largest slowdown a noisy baseline may excuse (default 0.25 = 25%%)")
+
+    for subparser in (run_parser, compare_parser):
+        subparser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline JSON file")
+        subparser.add_argument("--filter", default=None, help="Only run cases whose name contains this")
+        subparser.add_argument("--repeat", type=int, default=21, help="Timed rounds over all cases; medians are kept")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; create one with 'run --save'", file=sys.stderr)
+            return 2
+        baseline = load_baseline(args.baseline)
+        results = run_cases(args.filter, args.repeat)
+        regressions = compare(results, baseline, args.threshold, args.max_allowance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond the allowed change: {', '.join(regressions)}")
+            return 1
+        print("\nNo regressions beyond the allowed change")
+        return 0
+
+    results = run_cases(args.filter, args.repeat)
+    print(json.dumps({name: timing._asdict() for name, timing in results.items()}, indent=2))
+    if args.save:
+        save_baseline(args.baseline, results, merge=bool(args.filter))
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from api.routes import router
+from services.run_store import run_store
 
 app = FastAPI(
     title="ParaGen",
@@ -23,6 +24,11 @@ app.include_router(router, prefix="/api/v1")
 async def root():
     return {"message": "Parallel LLM Response Generator API"}
 
+@app.on_event("shutdown")
+async def shutdown():
+    # Flush recorded runs before the process exits
+    run_store.close()
+
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
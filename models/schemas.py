@@ -1,6 +1,17 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from datetime import datetime
+from enum import Enum
+
+class GenerationStrategy(str, Enum):
+    SEQUENTIAL = "sequential"
+    PARALLEL = "parallel"
+    LONG_FORM = "long_form"
+
+class RequestPriority(str, Enum):
+    INTERACTIVE = "interactive"
+    STANDARD = "standard"
+    BULK = "bulk"
 
 class SectionInfo(BaseModel):
     section_heading: str = Field(..., description="The heading of the section")
@@ -14,15 +25,30 @@ class GeneratedSection(BaseModel):
     content: str
     word_count: int
     generation_time_ms: float
+    section_number: Optional[str] = Field(None, description="Outline number of the section in long-form answers, e.g. '2.1'")
+    target_words: Optional[int] = Field(None, description="Word budget the section was planned with")
+    truncated: bool = Field(False, description="True if generation was stopped early for overrunning the word budget")
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    model: Optional[str] = Field(None, description="Model deployment that generated the section")
+    section_index: Optional[int] = Field(None, description="Position of the section in the response's sections")
+    retries: int = Field(0, description="Retries spent on the section after its first attempt")
+    failed: bool = Field(False, description="True if every attempt failed; the section has no content")
+    error: Optional[str] = Field(None, description="Last error of a failed section")
 
 class LLMRequest(BaseModel):
     question: str = Field(..., description="The user's question to be answered")
+    target_words: Optional[int] = Field(None, gt=0, description="Total target length for long-form generation")
+    priority: RequestPriority = Field(RequestPriority.STANDARD, description="Scheduling class for the request's LLM calls")
+    tenant_id: Optional[str] = Field(None, description="Tenant or API key identifier used for fair queuing")
 
 class SequentialResponse(BaseModel):
     answer: str
     generation_time_ms: float
     word_count: int
     timestamp: datetime
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
 
 class ParallelResponse(BaseModel):
     answer: str
@@ -32,6 +58,33 @@ class ParallelResponse(BaseModel):
     parallel_generation_time_ms: float
     word_count: int
     timestamp: datetime
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    partial: bool = Field(False, description="True if some sections failed and were left out of the answer")
+    failed_sections: List[int] = Field(default_factory=list, description="Indexes of the failed sections")
+    session_id: Optional[str] = Field(None, description="Session for regenerating individual sections later")
+
+class PlanNode(BaseModel):
+    section_heading: str
+    section_content_size_in_words: int
+    section_number: str = Field(..., description="Outline number of the node, e.g. '2.1'")
+    children: List["PlanNode"] = Field(default_factory=list, description="Subsections; empty for leaves")
+
+PlanNode.update_forward_refs()
+
+class LevelTiming(BaseModel):
+    depth: int
+    planning_time_ms: float
+    node_count: int
+    leaf_count: int = 0
+    max_leaf_generation_time_ms: float = 0.0
+    planning_failures: int = Field(0, description="Nodes at this depth left unsplit because planning their subsections failed")
+
+class LongFormResponse(ParallelResponse):
+    plan: List[PlanNode]
+    plan_depth: int
+    leaf_count: int
+    level_timings: List[LevelTiming]
 
 class PerformanceComparison(BaseModel):
     question: str
@@ -39,4 +92,47 @@ class PerformanceComparison(BaseModel):
     parallel_response: ParallelResponse
     speedup_factor: float
     time_saved_ms: float
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+class BatchItem(BaseModel):
+    question: str = Field(..., description="The question to be answered")
+    strategy: GenerationStrategy = Field(GenerationStrategy.PARALLEL, description="Generation strategy for this item")
+    target_words: Optional[int] = Field(None, gt=0, description="Total target length for long-form generation")
+    id: Optional[str] = Field(None, description="Caller-supplied identifier echoed back in the result")
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(..., min_items=1, description="Questions to generate answers for")
+    priority: RequestPriority = Field(RequestPriority.BULK, description="Scheduling class for the batch's LLM calls")
+    tenant_id: Optional[str] = Field(None, description="Tenant or API key identifier used for fair queuing")
+
+class BatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    id: Optional[str]
+    question: str
+    strategy: GenerationStrategy
+    status: str = Field(..., description="'ok' or 'error'")
+    deduplicated: bool = Field(False, description="True if the result was shared with an identical earlier item")
+    queue_wait_ms: float
+    generation_time_ms: float
+    result: Optional[Union[LongFormResponse, ParallelResponse, SequentialResponse]] = None
+    error: Optional[str] = None
+
+class ClassifyBatchRequest(BaseModel):
+    questions: List[str] = Field(..., min_items=1, description="Questions to classify")
+
+class SectionRegenerationRequest(BaseModel):
+    target_words: Optional[int] = Field(None, gt=0, description="New word budget for the section; keeps the current one if omitted")
+    priority: RequestPriority = Field(RequestPriority.STANDARD, description="Scheduling class for the regeneration's LLM calls")
+    tenant_id: Optional[str] = Field(None, description="Tenant or API key identifier used for fair queuing")
+
+class SectionRegenerationResponse(BaseModel):
+    session_id: str
+    section_index: int
+    section: GeneratedSection
+    response: Union[LongFormResponse, ParallelResponse] = Field(..., description="The session's response with the section replaced and the answer reassembled")
+    regeneration_time_ms: float
+    prompt_tokens: int
+    completion_tokens: int
+    full_generation_time_ms: float = Field(..., description="Total time of the original full generation")
+    time_saved_ms: float = Field(..., description="Full generation time minus regeneration time")
+    tokens_saved: int = Field(..., description="Tokens of the original full generation minus tokens used to regenerate")
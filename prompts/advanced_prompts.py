@@ -63,32 +63,36 @@ SECTION_TYPE_KEYWORDS = {
     "practical": ["practices", "steps", "guide", "how to", "process", "workflow", "best practices", "challenges"]
 }
 
-def get_section_prompt(section_heading: str, question: str, target_words: int) -> str:
+def get_section_type(section_heading: str) -> str:
     """
-    Select the most appropriate prompt based on section content
+    Classify a section heading as technical, practical or conceptual
     """
     section_lower = section_heading.lower()
     
     # Check for technical keywords
     if any(keyword in section_lower for keyword in SECTION_TYPE_KEYWORDS["technical"]):
-        return TECHNICAL_SECTION_PROMPT.format(
-            main_question=question,
-            section_heading=section_heading,
-            target_words=target_words
-        )
+        return "technical"
     
     # Check for practical keywords
     elif any(keyword in section_lower for keyword in SECTION_TYPE_KEYWORDS["practical"]):
-        return PRACTICAL_SECTION_PROMPT.format(
-            main_question=question,
-            section_heading=section_heading,
-            target_words=target_words
-        )
+        return "practical"
     
     # Default to conceptual
     else:
-        return CONCEPTUAL_SECTION_PROMPT.format(
-            main_question=question,
-            section_heading=section_heading,
-            target_words=target_words
-        )
\ No newline at end of file
+        return "conceptual"
+
+SECTION_TYPE_PROMPTS = {
+    "technical": TECHNICAL_SECTION_PROMPT,
+    "practical": PRACTICAL_SECTION_PROMPT,
+    "conceptual": CONCEPTUAL_SECTION_PROMPT
+}
+
+def get_section_prompt(section_heading: str, question: str, target_words: int) -> str:
+    """
+    Select the most appropriate prompt based on section content
+    """
+    return SECTION_TYPE_PROMPTS[get_section_type(section_heading)].format(
+        main_question=question,
+        section_heading=section_heading,
+        target_words=target_words
+    )
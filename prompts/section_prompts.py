@@ -19,6 +19,41 @@ Guidelines:
 Return only the CSV data with NO headers, NO explanations, NO other text:
 """
 
+LONG_FORM_SECTION_IDENTIFICATION_PROMPT = """
+Analyze the following question and plan the top-level sections of a long-form document that answers it.
+
+Question: "{question}"
+Total Target Length: {target_words} words
+
+Return your response as CSV format with exactly 2 columns: section heading and estimated word count.
+
+Guidelines:
+- Create 4-8 top-level sections
+- Word counts should add up to roughly the total target length
+- Sections should be logically ordered
+- Headings should be descriptive and specific
+
+Return only the CSV data with NO headers, NO explanations, NO other text:
+"""
+
+SUBSECTION_IDENTIFICATION_PROMPT = """
+Break the following section of a long-form answer into logical subsections.
+
+Main Question: "{question}"
+Section: "{section_heading}"
+Section Target Length: {target_words} words
+
+Return your response as CSV format with exactly 2 columns: subsection heading and estimated word count.
+
+Guidelines:
+- Create 2-5 subsections
+- Word counts should add up to roughly the section target length
+- Subsections should be logically ordered and must not overlap
+- Headings should be descriptive and specific
+
+Return only the CSV data with NO headers, NO explanations, NO other text:
+"""
+
 SECTION_CONTENT_FOCUSED_PROMPT = """
 Write content for this specific section. Be direct and focused - do not include introductory phrases or section headings in your response.
 
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from models.schemas import (
+    BatchItem,
+    BatchItemResult,
+    GenerationStrategy,
+    LongFormResponse,
+    ParallelResponse,
+    SequentialResponse
+)
+from services.sequential_generator import sequential_generator
+from services.parallel_generator import parallel_generator
+from services.query_classifier import query_classifier, QueryType
+from services.simple_responder import simple_responder
+from services.request_context import RequestContext, set_request_context
+
+class BatchGenerator:
+    def __init__(self):
+        # Upper bound on items being generated at once; the LLM calls of all
+        # admitted items share the client's global concurrency budget
+        self.max_in_flight = int(os.getenv("PARAGEN_BATCH_MAX_IN_FLIGHT", "64"))
+
+    async def generate_item(
+        self,
+        item: BatchItem
+    ) -> Union[SequentialResponse, ParallelResponse, LongFormResponse]:
+        """Generate the response for a single item with its requested strategy"""
+        if item.strategy == GenerationStrategy.LONG_FORM:
+            return await parallel_generator.generate_long_form_response(
+                item.question,
+                target_words=item.target_words
+            )
+
+        if item.strategy == GenerationStrategy.PARALLEL:
+            return await parallel_generator.generate_parallel_response(item.question)
+
+        # Sequential items get the same simple-query bypass as /generate/sequential
+        query_type, _ = query_classifier.classify_query(item.question)
+        if simple_responder.should_bypass_llm(item.question, query_type):
+            if query_type == QueryType.SIMPLE_GREETING:
+                return simple_responder.generate_greeting_response()
+            return simple_responder.generate_simple_response(item.question)
+
+        return await sequential_generator.generate_sequential_response(item.question)
+
+    async def stream_batch(
+        self,
+        items: List[BatchItem],
+        context: Optional[RequestContext] = None
+    ) -> AsyncIterator[BatchItemResult]:
+        """
+        Generate responses for all items, yielding results in completion order.
+        Identical items are generated once and the result is shared.
+        """
+        context = context or RequestContext()
+        groups: Dict[Tuple[str, GenerationStrategy, int], List[int]] = {}
+        for index, item in enumerate(items):
+            key = (item.question.strip(), item.strategy, item.target_words or 0)
+            groups.setdefault(key, []).append(index)
+
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def run_group(indices: List[int]) -> None:
+            set_request_context(context)
+            item = items[indices[0]]
+            enqueue_time = time.time()
+
+            async with semaphore:
+                start_time = time.time()
+                result, error = None, None
+                try:
+                    result = await self.generate_item(item)
+                except Exception as e:
+                    error = str(e)
+                end_time = time.time()
+
+            for n, index in enumerate(indices):
+                results.put_nowait(BatchItemResult(
+                    index=index,
+                    id=items[index].id,
+                    question=items[index].question,
+                    strategy=items[index].strategy,
+                    status="error" if error else "ok",
+                    deduplicated=n > 0,
+                    queue_wait_ms=(start_time - enqueue_time) * 1000,
+                    generation_time_ms=(end_time - start_time) * 1000,
+                    result=result,
+                    error=error
+                ))
+
+        tasks = [asyncio.create_task(run_group(indices)) for indices in groups.values()]
+
+        try:
+            for _ in range(len(items)):
+                yield await results.get()
+        finally:
+            # Stop outstanding work if the consumer goes away
+            for task in tasks:
+                task.cancel()
+
+# Global instance
+batch_generator = BatchGenerator()
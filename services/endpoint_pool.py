@@ -0,0 +1,316 @@
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, List, Optional, Tuple
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    RateLimitError
+)
+from services.metrics import summarize_latencies
+
+class Endpoint:
+    """One Azure OpenAI deployment with its own concurrency limit, quota and health"""
+
+    def __init__(
+        self,
+        name: str,
+        endpoint: str,
+        api_key: str,
+        max_concurrency: int = 32,
+        requests_per_minute: Optional[int] = None
+    ):
+        self.name = name
+        self.endpoint = endpoint
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+
+        # Configure client for Azure OpenAI using standard OpenAI SDK interface
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=f"{endpoint.rstrip('/')}/openai/v1/"
+        )
+
+        self.in_flight = 0
+        self.ewma_latency_ms: Optional[float] = None
+        self.latency_ms: Deque[float] = deque(maxlen=2048)
+        self.request_times: Deque[float] = deque()
+        self.calls = 0
+        self.errors = 0
+
+        # Health: ejected after consecutive failures, re-admitted through a single probe
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejection_count = 0
+        self.consecutive_ejections = 0
+        self.probing = False
+        # Bumped on every ejection and re-admission; calls reserved under an
+        # older generation say nothing about the endpoint's current health
+        self.generation = 0
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > 0
+
+    def quota_available(self, now: float) -> bool:
+        if not self.requests_per_minute:
+            return True
+        while self.request_times and now - self.request_times[0] >= 60:
+            self.request_times.popleft()
+        return len(self.request_times) < self.requests_per_minute
+
+    def can_accept(self, now: float) -> bool:
+        if self.in_flight >= self.max_concurrency or not self.quota_available(now):
+            return False
+        if self.ejected:
+            # Half-open: one probe at a time once the ejection period is over
+            return now >= self.ejected_until and not self.probing
+        return True
+
+    def next_ready_in(self, now: float) -> Optional[float]:
+        """
+        Seconds until quota or ejection stops blocking this endpoint, or None
+        when only a finishing call (or probe) can unblock it
+        """
+        if self.in_flight >= self.max_concurrency or (self.ejected and self.probing):
+            return None
+        waits = [0.0]
+        if self.ejected:
+            waits.append(self.ejected_until - now)
+        if self.requests_per_minute and len(self.request_times) >= self.requests_per_minute:
+            waits.append(60 - (now - self.request_times[0]))
+        return max(waits)
+
+class EndpointPool:
+    """
+    Routes LLM calls across deployments of the same model.
+
+    Each call samples two endpoints with spare capacity and picks the one
+    with the lower EWMA latency weighted by its in-flight load (power of
+    two choices). Endpoints that fail repeatedly are ejected with
+    exponential backoff and re-admitted after a successful probe.
+    """
+
+    def __init__(self, endpoints: List[Endpoint]):
+        if not endpoints:
+            raise ValueError("Endpoint pool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.ewma_alpha = float(os.getenv("OPENAI_ENDPOINT_EWMA_ALPHA", "0.3"))
+        self.failure_threshold = int(os.getenv("OPENAI_ENDPOINT_FAILURE_THRESHOLD", "3"))
+        self.ejection_base_s = float(os.getenv("OPENAI_ENDPOINT_EJECTION_S", "10"))
+        self.ejection_max_s = float(os.getenv("OPENAI_ENDPOINT_EJECTION_MAX_S", "300"))
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @classmethod
+    def from_env(cls) -> "EndpointPool":
+        """
+        Build the pool from OPENAI_ENDPOINTS, a JSON list of
+        {"name", "endpoint", "api_key", "max_concurrency", "requests_per_minute"}
+        objects, or from the single OPENAI_ENDPOINT when it is not set
+        """
+        api_key = os.getenv("OPENAI_API_KEY")
+        endpoints_config = os.getenv("OPENAI_ENDPOINTS")
+        default_concurrency = int(os.getenv("OPENAI_ENDPOINT_MAX_CONCURRENCY", "32"))
+
+        if endpoints_config:
+            try:
+                configs = json.loads(endpoints_config)
+            except ValueError as e:
+                raise ValueError(f"OPENAI_ENDPOINTS must be a JSON list of endpoint objects: {str(e)}")
+        else:
+            endpoint = os.getenv("OPENAI_ENDPOINT")
+            if not endpoint:
+                raise ValueError("Missing required OpenAI endpoint. Please set OPENAI_ENDPOINT environment variable.")
+            configs = [{"name": "default", "endpoint": endpoint}]
+
+        endpoints = []
+        for i, config in enumerate(configs):
+            endpoint_key = config.get("api_key") or api_key
+            if not endpoint_key:
+                raise ValueError("Missing required OpenAI API key. Please set OPENAI_API_KEY environment variable.")
+            if not config.get("endpoint"):
+                raise ValueError(f"OPENAI_ENDPOINTS entry {i} has no endpoint")
+            endpoints.append(Endpoint(
+                name=config.get("name") or f"endpoint-{i}",
+                endpoint=config["endpoint"],
+                api_key=endpoint_key,
+                max_concurrency=int(config.get("max_concurrency") or default_concurrency),
+                requests_per_minute=config.get("requests_per_minute")
+            ))
+        return cls(endpoints)
+
+    @property
+    def max_concurrency(self) -> int:
+        """Calls the whole pool can have in flight"""
+        return sum(endpoint.max_concurrency for endpoint in self.endpoints)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Reserve the best endpoint for one call and record how the call went"""
+        endpoint, probe = await self._reserve()
+        generation = endpoint.generation
+        start_time = time.perf_counter()
+        try:
+            yield endpoint
+        except Exception as e:
+            self._record_failure(endpoint, e, probe, generation)
+            raise
+        else:
+            self._record_success(endpoint, (time.perf_counter() - start_time) * 1000, probe, generation)
+        finally:
+            endpoint.in_flight -= 1
+            if probe:
+                endpoint.probing = False
+            self._wake_waiter()
+
+    def get_stats(self) -> dict:
+        """Per-endpoint traffic share, latency and health"""
+        total_calls = sum(endpoint.calls for endpoint in self.endpoints)
+        now = time.monotonic()
+        return {
+            "endpoints": [
+                {
+                    "name": endpoint.name,
+                    "endpoint": endpoint.endpoint,
+                    "state": self._state(endpoint, now),
+                    "in_flight": endpoint.in_flight,
+                    "max_concurrency": endpoint.max_concurrency,
+                    "requests_per_minute": endpoint.requests_per_minute,
+                    "calls": endpoint.calls,
+                    "errors": endpoint.errors,
+                    "traffic_share": round(endpoint.calls / total_calls, 4) if total_calls else 0.0,
+                    "ewma_latency_ms": round(endpoint.ewma_latency_ms, 2) if endpoint.ewma_latency_ms is not None else None,
+                    "latency": summarize_latencies(endpoint.latency_ms),
+                    "ejections": endpoint.ejection_count
+                }
+                for endpoint in self.endpoints
+            ]
+        }
+
+    async def _reserve(self) -> Tuple[Endpoint, bool]:
+        """Reserve an endpoint; the flag is True when this call is its re-admission probe"""
+        while True:
+            now = time.monotonic()
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.can_accept(now)]
+
+            if not candidates and all(endpoint.ejected for endpoint in self.endpoints):
+                # Every endpoint is ejected: fail open to the one closest to re-admission
+                endpoint = min(self.endpoints, key=lambda endpoint: endpoint.ejected_until)
+                if endpoint.in_flight < endpoint.max_concurrency and endpoint.quota_available(now):
+                    candidates = [endpoint]
+
+            if candidates:
+                endpoint = self._choose(candidates)
+                endpoint.in_flight += 1
+                if endpoint.requests_per_minute:
+                    # Only quota-limited endpoints prune this window
+                    endpoint.request_times.append(now)
+                probe = endpoint.ejected and not endpoint.probing
+                if probe:
+                    endpoint.probing = True
+                return endpoint, probe
+
+            # Wait for a call to finish, or for a quota window or ejection to lapse
+            ready_in = [
+                wait for wait in (endpoint.next_ready_in(now) for endpoint in self.endpoints)
+                if wait is not None
+            ]
+            timeout = max(min(ready_in), 0.01) if ready_in else None
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def _choose(self, candidates: List[Endpoint]) -> Endpoint:
+        if len(candidates) == 1:
+            return candidates[0]
+
+        # Endpoints without a latency estimate yet are treated as the fastest known
+        known = [endpoint.ewma_latency_ms for endpoint in candidates if endpoint.ewma_latency_ms is not None]
+        optimistic_ms = min(known) if known else 1.0
+
+        def score(endpoint: Endpoint) -> float:
+            latency = endpoint.ewma_latency_ms if endpoint.ewma_latency_ms is not None else optimistic_ms
+            return latency * (endpoint.in_flight + 1)
+
+        first, second = random.sample(candidates, 2)
+        return first if score(first) <= score(second) else second
+
+    def _record_success(self, endpoint: Endpoint, latency_ms: float, probe: bool, generation: int) -> None:
+        endpoint.calls += 1
+        endpoint.latency_ms.append(latency_ms)
+
+        if probe:
+            # Probe succeeded: re-admit with a fresh latency estimate
+            endpoint.ejected_until = 0.0
+            endpoint.consecutive_ejections = 0
+            endpoint.consecutive_failures = 0
+            endpoint.ewma_latency_ms = latency_ms
+            endpoint.generation += 1
+            return
+        if endpoint.ejected or generation != endpoint.generation:
+            # Calls reserved before the latest ejection neither re-admit nor reset health
+            return
+
+        endpoint.consecutive_failures = 0
+        if endpoint.ewma_latency_ms is None:
+            endpoint.ewma_latency_ms = latency_ms
+        else:
+            endpoint.ewma_latency_ms += self.ewma_alpha * (latency_ms - endpoint.ewma_latency_ms)
+
+    def _record_failure(self, endpoint: Endpoint, error: Exception, probe: bool, generation: int) -> None:
+        endpoint.calls += 1
+        endpoint.errors += 1
+        if not self.is_transient_failure(error):
+            # Bad requests say nothing about the endpoint's health
+            return
+        if not probe and (endpoint.ejected or generation != endpoint.generation):
+            # Calls reserved before the latest ejection
+            return
+
+        endpoint.consecutive_failures += 1
+        if probe or endpoint.consecutive_failures >= self.failure_threshold:
+            self._eject(endpoint)
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        backoff = min(self.ejection_base_s * (2 ** endpoint.consecutive_ejections), self.ejection_max_s)
+        endpoint.ejected_until = time.monotonic() + backoff
+        endpoint.ejection_count += 1
+        endpoint.consecutive_ejections += 1
+        endpoint.consecutive_failures = 0
+        endpoint.generation += 1
+
+    @staticmethod
+    def is_transient_failure(error: Exception) -> bool:
+        """Connection errors, timeouts, 429s and 5xx; anything else is the request's fault"""
+        # The SDK does not wrap transport errors raised while iterating a stream
+        if isinstance(error, (APIConnectionError, RateLimitError, httpx.TransportError)):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code >= 500
+        return isinstance(error, (asyncio.TimeoutError, TimeoutError))
+
+    def _wake_waiter(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _state(self, endpoint: Endpoint, now: float) -> str:
+        if not endpoint.ejected:
+            return "healthy"
+        if endpoint.probing:
+            return "probing"
+        return "ejected" if now < endpoint.ejected_until else "awaiting_probe"
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+from models.schemas import RequestPriority
+from services.metrics import summarize_latencies
+
+class _ClassStats:
+    def __init__(self):
+        self.wait_ms: Deque[float] = deque(maxlen=2048)
+        self.completed_at: Deque[float] = deque(maxlen=8192)
+        self.dispatched = 0
+        self.completed = 0
+        self.in_flight = 0
+
+class FairScheduler:
+    """
+    Weighted-fair admission of LLM calls.
+
+    Priority classes share the concurrency budget in proportion to their
+    weights (stride scheduling), and tenants within a class are served
+    round-robin so a single tenant cannot starve the others.
+    """
+
+    def __init__(self):
+        # Without OPENAI_MAX_CONCURRENCY the budget follows the endpoint pool's capacity
+        self.max_concurrency_configured = bool(os.getenv("OPENAI_MAX_CONCURRENCY"))
+        self.max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+        self.weights = {
+            RequestPriority.INTERACTIVE: int(os.getenv("PARAGEN_WEIGHT_INTERACTIVE", "8")),
+            RequestPriority.STANDARD: int(os.getenv("PARAGEN_WEIGHT_STANDARD", "4")),
+            RequestPriority.BULK: int(os.getenv("PARAGEN_WEIGHT_BULK", "1"))
+        }
+        self.throughput_window_s = 60.0
+
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._pass = {priority: 0.0 for priority in RequestPriority}
+        # priority -> tenant -> waiting futures, tenants kept in round-robin order
+        self._queues: Dict[RequestPriority, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+        self._stats = {priority: _ClassStats() for priority in RequestPriority}
+
+    def set_default_concurrency(self, max_concurrency: int) -> None:
+        """Size the budget to the capacity behind it unless OPENAI_MAX_CONCURRENCY pins it"""
+        if not self.max_concurrency_configured:
+            self.max_concurrency = max_concurrency
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: RequestPriority, tenant_id: str):
+        """Hold one unit of the concurrency budget for the duration of an LLM call"""
+        await self.acquire(priority, tenant_id)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    async def acquire(self, priority: RequestPriority, tenant_id: str) -> None:
+        """Wait until the scheduler dispatches this call"""
+        stats = self._stats[priority]
+        enqueue_time = time.perf_counter()
+
+        if self._in_flight < self.max_concurrency and not self._has_waiters():
+            self._start(priority)
+            stats.wait_ms.append(0.0)
+            return
+
+        tenants = self._queues[priority]
+        if not tenants:
+            # A class returning from idle must not bank credit for the time it was idle
+            self._pass[priority] = max(self._pass[priority], self._virtual_time)
+
+        future = asyncio.get_running_loop().create_future()
+        tenants.setdefault(tenant_id, deque()).append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Dispatched but cancelled before running: hand the slot on
+                self.release(priority)
+            else:
+                self._remove_waiter(priority, tenant_id, future)
+            raise
+
+        stats.wait_ms.append((time.perf_counter() - enqueue_time) * 1000)
+
+    def release(self, priority: RequestPriority) -> None:
+        """Return a unit of the budget and dispatch the next waiting call"""
+        stats = self._stats[priority]
+        stats.in_flight -= 1
+        stats.completed += 1
+        stats.completed_at.append(time.monotonic())
+        self._in_flight -= 1
+        self._dispatch()
+
+    def get_stats(self) -> dict:
+        """Per-class queue wait times, queue depth and throughput"""
+        now = time.monotonic()
+        classes = {}
+        for priority in RequestPriority:
+            stats = self._stats[priority]
+            recent = sum(1 for t in stats.completed_at if now - t <= self.throughput_window_s)
+            classes[priority.value] = {
+                "weight": self.weights[priority],
+                "queued": sum(len(queue) for queue in self._queues[priority].values()),
+                "queued_tenants": len(self._queues[priority]),
+                "in_flight": stats.in_flight,
+                "dispatched": stats.dispatched,
+                "completed": stats.completed,
+                "throughput_per_minute": round(recent * 60 / self.throughput_window_s, 2),
+                "queue_wait": summarize_latencies(stats.wait_ms)
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "classes": classes
+        }
+
+    def _start(self, priority: RequestPriority) -> None:
+        stats = self._stats[priority]
+        stats.dispatched += 1
+        stats.in_flight += 1
+        self._in_flight += 1
+
+    def _has_waiters(self) -> bool:
+        return any(self._queues[priority] for priority in RequestPriority)
+
+    def _next_class(self) -> Optional[RequestPriority]:
+        active = [priority for priority in RequestPriority if self._queues[priority]]
+        if not active:
+            return None
+        return min(active, key=lambda priority: (self._pass[priority], -self.weights[priority]))
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_concurrency:
+            priority = self._next_class()
+            if priority is None:
+                return
+
+            tenants = self._queues[priority]
+            tenant_id, queue = next(iter(tenants.items()))
+            future = queue.popleft()
+            if queue:
+                tenants.move_to_end(tenant_id)
+            else:
+                del tenants[tenant_id]
+
+            if future.cancelled():
+                continue
+
+            self._virtual_time = self._pass[priority]
+            self._pass[priority] += 1 / max(self.weights[priority], 1)
+            self._start(priority)
+            future.set_result(None)
+
+    def _remove_waiter(self, priority: RequestPriority, tenant_id: str, future: asyncio.Future) -> None:
+        tenants = self._queues[priority]
+        queue = tenants.get(tenant_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            return
+        if not queue:
+            del tenants[tenant_id]
+
+# Global instance
+fair_scheduler = FairScheduler()
@@ -0,0 +1,21 @@
+from typing import Dict, Iterable
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = int(round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[rank]
+
+def summarize_latencies(values: Iterable[float]) -> Dict[str, float]:
+    """Summarize latency samples (ms) as count, mean and tail percentiles"""
+    sorted_values = sorted(values)
+    count = len(sorted_values)
+    return {
+        "count": count,
+        "mean_ms": round(sum(sorted_values) / count, 2) if count else 0.0,
+        "p50_ms": round(percentile(sorted_values, 50), 2),
+        "p95_ms": round(percentile(sorted_values, 95), 2),
+        "p99_ms": round(percentile(sorted_values, 99), 2),
+        "max_ms": round(sorted_values[-1], 2) if count else 0.0
+    }
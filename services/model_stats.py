@@ -0,0 +1,67 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+from services.metrics import summarize_latencies
+
+class _UsageStats:
+    def __init__(self):
+        self.latency_ms: Deque[float] = deque(maxlen=2048)
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency": summarize_latencies(self.latency_ms)
+        }
+
+class ModelStats:
+    """Latency and token usage of LLM calls, per model and per pipeline stage"""
+
+    def __init__(self):
+        self._by_model: Dict[str, _UsageStats] = {}
+        self._by_stage: Dict[str, _UsageStats] = {}
+        self._stage_models: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        model: str,
+        stage: str,
+        latency_ms: float,
+        prompt_tokens: Optional[int] = 0,
+        completion_tokens: Optional[int] = 0,
+        error: bool = False
+    ) -> None:
+        """Record one LLM call"""
+        with self._lock:
+            self._stage_models[stage] = model
+            for stats in (
+                self._by_model.setdefault(model, _UsageStats()),
+                self._by_stage.setdefault(stage, _UsageStats())
+            ):
+                stats.calls += 1
+                if error:
+                    stats.errors += 1
+                    continue
+                stats.latency_ms.append(latency_ms)
+                stats.prompt_tokens += prompt_tokens or 0
+                stats.completion_tokens += completion_tokens or 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "models": {model: stats.to_dict() for model, stats in self._by_model.items()},
+                "stages": {
+                    stage: {"model": self._stage_models[stage], **stats.to_dict()}
+                    for stage, stats in self._by_stage.items()
+                }
+            }
+
+# Global instance
+model_stats = ModelStats()
@@ -1,52 +1,242 @@
 import os
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
 import asyncio
+import re
+import time
+from enum import Enum
 from typing import Optional, List
+import httpx
+from openai import APIConnectionError
+from services.endpoint_pool import EndpointPool
+from services.fair_scheduler import fair_scheduler
+from services.model_stats import model_stats
+from services.request_context import get_request_context
 
 load_dotenv()
 
+# End of a sentence: terminal punctuation, optional closing quotes/brackets, then whitespace
+SENTENCE_BOUNDARY = re.compile(r'[.!?]["\')\]]*(?=\s)')
+
+# Line-leading list markers such as "1." or "a)" that end in sentence punctuation
+LIST_MARKER = re.compile(r'[ \t]*(?:\d+|[a-zA-Z])')
+
+# Abbreviations whose period does not end a sentence
+ABBREVIATIONS = frozenset(['e.g', 'i.e', 'vs', 'cf', 'approx', 'incl', 'mr', 'mrs', 'ms', 'dr', 'st', 'fig'])
+
+def find_sentence_boundary(text: str, start: int = 0) -> Optional[int]:
+    """
+    End offset of the first sentence ending in text at or after start,
+    skipping list markers and abbreviations
+    """
+    for match in SENTENCE_BOUNDARY.finditer(text, start):
+        position = match.start()
+        line_start = text.rfind("\n", 0, position) + 1
+        if LIST_MARKER.fullmatch(text, line_start, position):
+            continue
+        word_start = max(text.rfind(" ", line_start, position), line_start - 1) + 1
+        word = text[word_start:position].lstrip("(\"'").lower()
+        if text[position] == "." and word in ABBREVIATIONS:
+            continue
+        return match.end()
+    return None
+
+class ModelStage(str, Enum):
+    """Pipeline stages that can be routed to different models"""
+    IDENTIFICATION = "identification"
+    SHORT_SECTION = "short_section"
+    LONG_SECTION = "long_section"
+    SEQUENTIAL = "sequential"
+    DEFAULT = "default"
+
+class StreamedCompletion:
+    """Text of a streamed completion and whether it was stopped early"""
+
+    def __init__(self, text: str, truncated: bool, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.text = text
+        self.truncated = truncated
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.model: Optional[str] = None
+
 class OpenAIClient:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.endpoint = os.getenv("OPENAI_ENDPOINT")
         self.api_version = os.getenv("OPENAI_API_VERSION")
         self.model = os.getenv("OPENAI_MODEL_NAME", "gpt-4.1-mini")
+        # Per-stage models; each falls back to OPENAI_MODEL_NAME
+        self.stage_models = {
+            ModelStage.IDENTIFICATION: os.getenv("OPENAI_MODEL_IDENTIFICATION") or self.model,
+            ModelStage.SHORT_SECTION: os.getenv("OPENAI_MODEL_SHORT_SECTION") or self.model,
+            ModelStage.LONG_SECTION: os.getenv("OPENAI_MODEL_LONG_SECTION") or self.model,
+            ModelStage.SEQUENTIAL: os.getenv("OPENAI_MODEL_SEQUENTIAL") or self.model,
+            ModelStage.DEFAULT: self.model
+        }
         
-        if not self.api_key:
-            raise ValueError("Missing required OpenAI API key. Please set OPENAI_API_KEY environment variable.")
-        
-        if not self.endpoint:
-            raise ValueError("Missing required OpenAI endpoint. Please set OPENAI_ENDPOINT environment variable.")
-        
-        # Configure client for Azure OpenAI using standard OpenAI SDK interface
-        base_url = f"{self.endpoint.rstrip('/')}/openai/v1/"
+        # One or more deployments of the same model (OPENAI_ENDPOINTS or OPENAI_ENDPOINT)
+        self.pool = EndpointPool.from_env()
         
-        self.client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url=base_url
-        )
+        # Weighted-fair budget of in-flight LLM calls shared by every request,
+        # by default as large as the pool's combined endpoint concurrency
+        self.scheduler = fair_scheduler
+        self.scheduler.set_default_concurrency(self.pool.max_concurrency)
+        self.model_stats = model_stats
+    
+    def get_model(self, stage: ModelStage = ModelStage.DEFAULT) -> str:
+        """Model deployment used for a pipeline stage"""
+        return self.stage_models.get(stage, self.model)
     
     async def generate_completion(
         self, 
         prompt: str, 
         max_tokens: Optional[int] = 1500,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        stage: ModelStage = ModelStage.DEFAULT
     ) -> str:
         """Generate a completion using OpenAI"""
+        context = get_request_context()
+        model = self.get_model(stage)
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
+            async with self.scheduler.slot(context.priority, context.tenant_id):
+                start_time = time.perf_counter()
+                try:
+                    async with self.pool.acquire() as endpoint:
+                        response = await endpoint.client.chat.completions.create(
+                            model=model,
+                            messages=[
+                                {"role": "user", "content": prompt}
+                            ],
+                            max_tokens=max_tokens,
+                            temperature=temperature
+                        )
+                except Exception:
+                    self.model_stats.record(model, stage.value, 0.0, error=True)
+                    raise
+                latency_ms = (time.perf_counter() - start_time) * 1000
+            
+            usage = response.usage
+            prompt_tokens = usage.prompt_tokens if usage else 0
+            completion_tokens = usage.completion_tokens if usage else 0
+            context.add_usage(prompt_tokens, completion_tokens)
+            self.model_stats.record(model, stage.value, latency_ms, prompt_tokens, completion_tokens)
             return response.choices[0].message.content
         except Exception as e:
-            raise Exception(f"OpenAI API error: {str(e)}")
+            raise Exception(f"OpenAI API error: {str(e)}") from e
     
+    async def stream_completion(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = 1500,
+        temperature: float = 0.7,
+        stop_after_words: Optional[int] = None,
+        stage: ModelStage = ModelStage.DEFAULT
+    ) -> StreamedCompletion:
+        """
+        Generate a completion by streaming it. Once stop_after_words words have
+        been produced, stop at the next sentence boundary and close the stream.
+        """
+        context = get_request_context()
+        model = self.get_model(stage)
+        try:
+            async with self.scheduler.slot(context.priority, context.tenant_id):
+                start_time = time.perf_counter()
+                try:
+                    async with self.pool.acquire() as endpoint:
+                        stream = await endpoint.client.chat.completions.create(
+                            model=model,
+                            messages=[
+                                {"role": "user", "content": prompt}
+                            ],
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            stream=True,
+                            stream_options={"include_usage": True}
+                        )
+                        try:
+                            completion = await self._consume_stream(stream, stop_after_words)
+                        except httpx.TransportError as e:
+                            # The SDK leaves errors raised while iterating the stream unwrapped
+                            raise APIConnectionError(
+                                message=f"Stream interrupted: {e}",
+                                request=httpx.Request("POST", endpoint.endpoint)
+                            ) from e
+                        finally:
+                            await stream.close()
+                except Exception:
+                    self.model_stats.record(model, stage.value, 0.0, error=True)
+                    raise
+                latency_ms = (time.perf_counter() - start_time) * 1000
+            
+            if not completion.prompt_tokens:
+                # Usage arrives in the final chunk, which an early stop never reads
+                completion.prompt_tokens = len(prompt) // 4
+            completion.model = model
+            context.add_usage(completion.prompt_tokens, completion.completion_tokens)
+            self.model_stats.record(
+                model,
+                stage.value,
+                latency_ms,
+                completion.prompt_tokens,
+                completion.completion_tokens
+            )
+            return completion
+        except Exception as e:
+            raise Exception(f"OpenAI API error: {str(e)}") from e
+
+    async def _consume_stream(self, stream, stop_after_words: Optional[int]) -> StreamedCompletion:
+        """Accumulate streamed deltas, cutting at a sentence boundary past the word limit"""
+        text = ""
+        word_count = 0
+        in_word = False
+        search_from = None
+        content_chunks = 0
+        usage = None
+        
+        async for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            
+            content_chunks += 1
+            chunk_start = len(text)
+            text += delta
+            if stop_after_words is None:
+                continue
+            
+            # Count words incrementally; a word may continue across chunks
+            new_words = len(delta.split())
+            if new_words and in_word and not delta[0].isspace():
+                new_words -= 1
+            in_word = not delta[-1].isspace()
+            word_count += new_words
+            
+            if word_count < stop_after_words:
+                continue
+            if search_from is None:
+                search_from = max(chunk_start - 1, 0)
+            
+            boundary = find_sentence_boundary(text, search_from)
+            if boundary is not None:
+                # Each content chunk carries roughly one token
+                return StreamedCompletion(
+                    text=text[:boundary],
+                    truncated=True,
+                    completion_tokens=content_chunks
+                )
+        
+        if usage:
+            return StreamedCompletion(
+                text=text,
+                truncated=False,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens
+            )
+        return StreamedCompletion(text=text, truncated=False, completion_tokens=content_chunks)
+
     async def generate_multiple_completions(
         self, 
         prompts: List[str], 
@@ -1,37 +1,74 @@
 import asyncio
+import logging
+import os
 import time
-from typing import List
-from models.schemas import SectionInfo, GeneratedSection, ParallelResponse
-from services.openai_client import get_openai_client
+from typing import Dict, List, Optional, Tuple
+from models.schemas import (
+    SectionInfo,
+    GeneratedSection,
+    ParallelResponse,
+    GenerationStrategy,
+    PlanNode,
+    LevelTiming,
+    LongFormResponse,
+    SectionRegenerationResponse
+)
+from services.openai_client import get_openai_client, ModelStage
+from services.endpoint_pool import EndpointPool
 from services.section_identifier import section_identifier
-from prompts.advanced_prompts import get_section_prompt
+from services.run_store import run_store
+from services.section_retry import section_retry_policy, RetryBudget
+from services.session_store import session_store, Session
+from services.request_context import child_context
+from prompts.advanced_prompts import get_section_prompt, get_section_type
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 class ParallelGenerator:
     def __init__(self):
-        pass
+        # Long-form mode: sections above this target are split into subsections
+        self.long_form_section_threshold = int(os.getenv("PARAGEN_LONG_FORM_SECTION_THRESHOLD", "400"))
+        self.long_form_max_depth = int(os.getenv("PARAGEN_LONG_FORM_MAX_DEPTH", "3"))
+        self.long_form_default_words = int(os.getenv("PARAGEN_LONG_FORM_DEFAULT_WORDS", "3000"))
+        # Stop a section once it reaches this multiple of its word budget (0 disables)
+        self.section_overrun_factor = float(os.getenv("PARAGEN_SECTION_OVERRUN_FACTOR", "1.3"))
+        # Non-technical sections up to this size go to the short-section model
+        self.short_section_max_words = int(os.getenv("PARAGEN_SHORT_SECTION_MAX_WORDS", "150"))
+        self.retry_policy = section_retry_policy
 
     async def generate_section_content(
         self, 
         main_question: str, 
-        section: SectionInfo
+        section: SectionInfo,
+        section_focus: Optional[str] = None,
+        section_number: Optional[str] = None
     ) -> GeneratedSection:
         """Generate content for a single section"""
         start_time = time.time()
         
         # Use advanced prompt selection based on section type
+        prompt_heading = section_focus or section.section_heading
         prompt = get_section_prompt(
-            section_heading=section.section_heading,
+            section_heading=prompt_heading,
             question=main_question,
             target_words=section.section_content_size_in_words
         )
+        stage = self._select_model_stage(prompt_heading, section.section_content_size_in_words)
+        
+        stop_after_words = None
+        if self.section_overrun_factor > 0:
+            stop_after_words = max(int(section.section_content_size_in_words * self.section_overrun_factor), 1)
         
         try:
-            content = await get_openai_client().generate_completion(
+            completion = await get_openai_client().stream_completion(
                 prompt=prompt,
                 max_tokens=min(section.section_content_size_in_words * 2, 1500),
-                temperature=0.7
+                temperature=0.7,
+                stop_after_words=stop_after_words,
+                stage=stage
             )
+            content = completion.text
             
             end_time = time.time()
             generation_time = (end_time - start_time) * 1000
@@ -41,14 +78,105 @@ class ParallelGenerator:
                 heading=section.section_heading,
                 content=content.strip(),
                 word_count=word_count,
-                generation_time_ms=generation_time
+                generation_time_ms=generation_time,
+                section_number=section_number,
+                target_words=section.section_content_size_in_words,
+                truncated=completion.truncated,
+                prompt_tokens=completion.prompt_tokens,
+                completion_tokens=completion.completion_tokens,
+                model=completion.model
             )
             
         except Exception as e:
-            raise Exception(f"Failed to generate section '{section.section_heading}': {str(e)}")
+            raise Exception(f"Failed to generate section '{section.section_heading}': {str(e)}") from e
+
+    async def generate_section_with_retries(
+        self,
+        main_question: str,
+        section: SectionInfo,
+        budget: RetryBudget,
+        section_index: int,
+        section_focus: Optional[str] = None,
+        section_number: Optional[str] = None
+    ) -> GeneratedSection:
+        """
+        Generate a section, retrying transient failures with jittered backoff
+        while the request's retry budget lasts. A section that still fails is
+        returned marked as failed instead of raising.
+        """
+        start_time = time.time()
+        attempts = 0
+        budget_exhausted = False
+        
+        while True:
+            attempts += 1
+            try:
+                generated = await self.generate_section_content(
+                    main_question,
+                    section,
+                    section_focus=section_focus,
+                    section_number=section_number
+                )
+                generated.section_index = section_index
+                generated.retries = attempts - 1
+                self.retry_policy.record_section(attempts, failed=False)
+                return generated
+            except Exception as e:
+                error = str(e)
+                retryable = self._is_retryable(e)
+            
+            if not retryable or attempts > self.retry_policy.max_retries:
+                break
+            if not budget.try_spend():
+                budget_exhausted = True
+                break
+            await asyncio.sleep(self.retry_policy.backoff_delay(attempts))
+        
+        self.retry_policy.record_section(attempts, failed=True, budget_exhausted=budget_exhausted)
+        return GeneratedSection(
+            heading=section.section_heading,
+            content="",
+            word_count=0,
+            generation_time_ms=(time.time() - start_time) * 1000,
+            section_number=section_number,
+            target_words=section.section_content_size_in_words,
+            section_index=section_index,
+            retries=attempts - 1,
+            failed=True,
+            error=error
+        )
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Whether any error in the cause chain is a transient API failure"""
+        while error is not None:
+            if EndpointPool.is_transient_failure(error):
+                return True
+            error = error.__cause__
+        return False
+
+    def _failed_section_indexes(self, sections: List[GeneratedSection]) -> List[int]:
+        """Indexes of failed sections; raises when there is nothing to salvage"""
+        failed_sections = [section.section_index for section in sections if section.failed]
+        self.retry_policy.record_request(len(failed_sections), len(sections))
+        if sections and len(failed_sections) == len(sections):
+            raise Exception(f"All {len(sections)} sections failed: {sections[0].error}")
+        return failed_sections
+
+    def _select_model_stage(self, section_heading: str, target_words: int) -> ModelStage:
+        """Route technical or long sections to the long-section model, the rest to the short one"""
+        if get_section_type(section_heading) == "technical" or target_words > self.short_section_max_words:
+            return ModelStage.LONG_SECTION
+        return ModelStage.SHORT_SECTION
 
     async def generate_parallel_response(self, question: str) -> ParallelResponse:
         """Generate a complete response using parallel section generation"""
+        return await run_store.track(
+            question,
+            GenerationStrategy.PARALLEL,
+            self._generate_parallel_response(question)
+        )
+
+    async def _generate_parallel_response(self, question: str) -> ParallelResponse:
         overall_start_time = time.time()
         
         # Step 1: Identify sections
@@ -58,14 +186,16 @@ class ParallelGenerator:
         # Step 2: Generate all sections in parallel
         parallel_start_time = time.time()
         
-        # Create tasks for parallel execution
+        # Create tasks for parallel execution; failed sections come back marked
+        budget = self.retry_policy.new_budget()
         tasks = [
-            self.generate_section_content(question, section_info)
-            for section_info in sections_info
+            self.generate_section_with_retries(question, section_info, budget, section_index=i)
+            for i, section_info in enumerate(sections_info)
         ]
         
         # Execute all tasks in parallel
         generated_sections = await asyncio.gather(*tasks)
+        failed_sections = self._failed_section_indexes(generated_sections)
         
         parallel_end_time = time.time()
         parallel_generation_time = (parallel_end_time - parallel_start_time) * 1000
@@ -85,14 +215,310 @@ class ParallelGenerator:
             section_identification_time_ms=identification_time,
             parallel_generation_time_ms=parallel_generation_time,
             word_count=total_word_count,
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            partial=bool(failed_sections),
+            failed_sections=failed_sections
+        )
+
+    async def generate_long_form_response(
+        self,
+        question: str,
+        target_words: Optional[int] = None
+    ) -> LongFormResponse:
+        """
+        Generate a long-form response by recursively decomposing large sections
+        into a plan tree and generating every leaf in parallel
+        """
+        return await run_store.track(
+            question,
+            GenerationStrategy.LONG_FORM,
+            self._generate_long_form_response(question, target_words)
+        )
+
+    async def _generate_long_form_response(
+        self,
+        question: str,
+        target_words: Optional[int] = None
+    ) -> LongFormResponse:
+        overall_start_time = time.time()
+        target_words = target_words or self.long_form_default_words
+        
+        # Step 1: Plan the top level of the document
+        section_response, identification_time = await section_identifier.identify_sections(
+            question,
+            target_words=target_words
+        )
+        plan = [
+            PlanNode(
+                section_heading=section.section_heading,
+                section_content_size_in_words=section.section_content_size_in_words,
+                section_number=str(i)
+            )
+            for i, section in enumerate(section_response.sections, 1)
+        ]
+        level_timings = [
+            LevelTiming(depth=1, planning_time_ms=identification_time, node_count=len(plan))
+        ]
+        
+        # Step 2: Split oversized nodes level by level, each level concurrently
+        frontier = [(node, node.section_heading) for node in plan]
+        depth = 1
+        while depth < self.long_form_max_depth:
+            oversized = [
+                (node, path) for node, path in frontier
+                if node.section_content_size_in_words > self.long_form_section_threshold
+            ]
+            if not oversized:
+                break
+            
+            level_start_time = time.time()
+            decomposed = await asyncio.gather(*[
+                self._decompose_node(question, node, path)
+                for node, path in oversized
+            ])
+            level_time = (time.time() - level_start_time) * 1000
+            level_timings[-1].planning_failures = decomposed.count(False)
+            
+            frontier = [
+                (child, f"{path} > {child.section_heading}")
+                for node, path in oversized
+                for child in node.children
+            ]
+            if not frontier:
+                break
+            
+            depth += 1
+            level_timings.append(
+                LevelTiming(depth=depth, planning_time_ms=level_time, node_count=len(frontier))
+            )
+        
+        # Step 3: Generate all leaves in parallel
+        leaves = self._collect_leaves(plan)
+        parallel_start_time = time.time()
+        
+        budget = self.retry_policy.new_budget()
+        tasks = [
+            self.generate_section_with_retries(
+                question,
+                SectionInfo(
+                    section_heading=node.section_heading,
+                    section_content_size_in_words=node.section_content_size_in_words
+                ),
+                budget,
+                section_index=i,
+                section_focus=path,
+                section_number=node.section_number
+            )
+            for i, (node, path, _) in enumerate(leaves)
+        ]
+        generated_sections = await asyncio.gather(*tasks)
+        failed_sections = self._failed_section_indexes(generated_sections)
+        
+        parallel_end_time = time.time()
+        parallel_generation_time = (parallel_end_time - parallel_start_time) * 1000
+        
+        for (_, _, leaf_depth), section in zip(leaves, generated_sections):
+            timing = level_timings[leaf_depth - 1]
+            timing.leaf_count += 1
+            timing.max_leaf_generation_time_ms = max(
+                timing.max_leaf_generation_time_ms,
+                section.generation_time_ms
+            )
+        
+        # Step 4: Assemble leaves back in tree order
+        sections_by_number = {section.section_number: section for section in generated_sections}
+        assembled_answer = self._assemble_long_form_response(plan, sections_by_number)
+        
+        overall_end_time = time.time()
+        total_time = (overall_end_time - overall_start_time) * 1000
+        
+        total_word_count = sum(section.word_count for section in generated_sections)
+        
+        return LongFormResponse(
+            answer=assembled_answer,
+            sections=generated_sections,
+            total_generation_time_ms=total_time,
+            section_identification_time_ms=sum(timing.planning_time_ms for timing in level_timings),
+            parallel_generation_time_ms=parallel_generation_time,
+            word_count=total_word_count,
+            timestamp=datetime.now(),
+            partial=bool(failed_sections),
+            failed_sections=failed_sections,
+            plan=plan,
+            plan_depth=max(leaf_depth for _, _, leaf_depth in leaves),
+            leaf_count=len(leaves),
+            level_timings=level_timings
+        )
+
+    async def regenerate_section(
+        self,
+        session: Session,
+        section_index: int,
+        target_words: Optional[int] = None
+    ) -> SectionRegenerationResponse:
+        """
+        Regenerate one section of a stored response, optionally with a new word
+        budget, and reassemble the answer without touching the other sections
+        """
+        response = session.response
+        previous = response.sections[section_index]
+        section_focus = None
+        plan_node = None
+        
+        if isinstance(response, LongFormResponse):
+            # Long-form leaves are generated with their full heading path as focus
+            for node, path, _ in self._collect_leaves(response.plan):
+                if node.section_number == previous.section_number:
+                    plan_node, section_focus = node, path
+                    break
+        
+        section = SectionInfo(
+            section_heading=previous.heading,
+            section_content_size_in_words=target_words or previous.target_words or max(previous.word_count, 1)
         )
+        
+        start_time = time.time()
+        with child_context() as context:
+            regenerated = await self.generate_section_with_retries(
+                session.question,
+                section,
+                self.retry_policy.new_budget(),
+                section_index=section_index,
+                section_focus=section_focus,
+                section_number=previous.section_number
+            )
+        regeneration_time = (time.time() - start_time) * 1000
+        
+        if regenerated.failed:
+            raise Exception(f"Failed to regenerate section {section_index}: {regenerated.error}")
+        
+        # Swap the section in and reassemble the answer
+        response.sections[section_index] = regenerated
+        if plan_node is not None:
+            plan_node.section_content_size_in_words = section.section_content_size_in_words
+        if isinstance(response, LongFormResponse):
+            sections_by_number = {section.section_number: section for section in response.sections}
+            response.answer = self._assemble_long_form_response(response.plan, sections_by_number)
+        else:
+            response.answer = self._assemble_response(response.sections)
+        response.word_count = sum(section.word_count for section in response.sections)
+        response.failed_sections = [section.section_index for section in response.sections if section.failed]
+        response.partial = bool(response.failed_sections)
+        response.prompt_tokens += context.prompt_tokens
+        response.completion_tokens += context.completion_tokens
+        session_store.record_regeneration(session)
+        
+        regeneration_tokens = context.prompt_tokens + context.completion_tokens
+        return SectionRegenerationResponse(
+            session_id=session.session_id,
+            section_index=section_index,
+            section=regenerated,
+            response=response,
+            regeneration_time_ms=regeneration_time,
+            prompt_tokens=context.prompt_tokens,
+            completion_tokens=context.completion_tokens,
+            full_generation_time_ms=session.full_generation_time_ms,
+            time_saved_ms=session.full_generation_time_ms - regeneration_time,
+            tokens_saved=session.full_generation_tokens - regeneration_tokens
+        )
+
+    async def _decompose_node(self, question: str, node: PlanNode, path: str) -> bool:
+        """
+        Attach subsections to a plan node, sized to add up to the node's own
+        target. Returns False if planning failed and the node stays a leaf.
+        """
+        try:
+            subsections = await section_identifier.identify_subsections(
+                question,
+                section_heading=path,
+                target_words=node.section_content_size_in_words
+            )
+        except Exception as e:
+            logger.warning("Could not split section %s (%s): %s", node.section_number, path, e)
+            return False
+        
+        # A single subsection is just the section itself
+        if len(subsections) < 2:
+            return True
+        
+        sizes = self._scale_sizes(
+            [subsection.section_content_size_in_words for subsection in subsections],
+            node.section_content_size_in_words
+        )
+        node.children = [
+            PlanNode(
+                section_heading=subsection.section_heading,
+                section_content_size_in_words=size,
+                section_number=f"{node.section_number}.{i}"
+            )
+            for i, (subsection, size) in enumerate(zip(subsections, sizes), 1)
+        ]
+        return True
+
+    @staticmethod
+    def _scale_sizes(sizes: List[int], total: int) -> List[int]:
+        """Scale word counts proportionally to sum to total, at least one word each"""
+        current = sum(sizes)
+        if current <= 0:
+            sizes, current = [1] * len(sizes), len(sizes)
+        exact = [size * total / current for size in sizes]
+        scaled = [int(value) for value in exact]
+        # Hand the words lost to rounding down to the largest remainders
+        by_remainder = sorted(range(len(sizes)), key=lambda i: exact[i] - scaled[i], reverse=True)
+        for i in by_remainder[:total - sum(scaled)]:
+            scaled[i] += 1
+        return [max(size, 1) for size in scaled]
+
+    def _collect_leaves(
+        self,
+        nodes: List[PlanNode],
+        parent_path: Optional[str] = None,
+        depth: int = 1
+    ) -> List[Tuple[PlanNode, str, int]]:
+        """Return (node, heading path, depth) for every leaf in tree order"""
+        leaves = []
+        for node in nodes:
+            path = f"{parent_path} > {node.section_heading}" if parent_path else node.section_heading
+            if node.children:
+                leaves.extend(self._collect_leaves(node.children, path, depth + 1))
+            else:
+                leaves.append((node, path, depth))
+        return leaves
+
+    def _assemble_long_form_response(
+        self,
+        nodes: List[PlanNode],
+        sections_by_number: Dict[str, GeneratedSection]
+    ) -> str:
+        """Assemble a long-form response with numbered nested headings, leaving out failed leaves"""
+        assembled_parts = []
+        
+        for node in nodes:
+            if not self._has_surviving_leaf(node, sections_by_number):
+                continue
+            separator = "." if "." not in node.section_number else ""
+            assembled_parts.append(f"{node.section_number}{separator} {node.section_heading}")
+            if node.children:
+                assembled_parts.append(
+                    self._assemble_long_form_response(node.children, sections_by_number)
+                )
+            else:
+                assembled_parts.append(sections_by_number[node.section_number].content)
+            assembled_parts.append("")  # Add spacing between sections
+        
+        return "\n".join(assembled_parts).strip()
+
+    def _has_surviving_leaf(self, node: PlanNode, sections_by_number: Dict[str, GeneratedSection]) -> bool:
+        """Whether a plan node has at least one leaf that was generated successfully"""
+        if not node.children:
+            return not sections_by_number[node.section_number].failed
+        return any(self._has_surviving_leaf(child, sections_by_number) for child in node.children)
 
     def _assemble_response(self, sections: List[GeneratedSection]) -> str:
-        """Assemble the final response from generated sections"""
+        """Assemble the final response from generated sections, leaving out failed ones"""
         assembled_parts = []
         
-        for i, section in enumerate(sections, 1):
+        for i, section in enumerate((section for section in sections if not section.failed), 1):
             assembled_parts.append(f"{i}. {section.heading}")
             assembled_parts.append(section.content)
             assembled_parts.append("")  # Add spacing between sections
@@ -49,7 +49,10 @@ class PerformanceAnalyzer:
                 "parallel_total_ms": comparison.parallel_response.total_generation_time_ms,
                 "section_identification_ms": comparison.parallel_response.section_identification_time_ms,
                 "parallel_generation_ms": comparison.parallel_response.parallel_generation_time_ms,
-                "section_count": len(comparison.parallel_response.sections)
+                "section_count": len(comparison.parallel_response.sections),
+                "truncated_section_count": sum(1 for section in comparison.parallel_response.sections if section.truncated),
+                "failed_section_count": len(comparison.parallel_response.failed_sections),
+                "section_retries": sum(section.retries for section in comparison.parallel_response.sections)
             },
             "content_metrics": {
                 "sequential_words": comparison.sequential_response.word_count,
@@ -65,7 +68,12 @@ class PerformanceAnalyzer:
             "section_performance": [
                 {
                     "heading": section.heading,
+                    "target_words": section.target_words,
                     "words": section.word_count,
+                    "truncated": section.truncated,
+                    "model": section.model,
+                    "retries": section.retries,
+                    "failed": section.failed,
                     "generation_time_ms": section.generation_time_ms,
                     "words_per_second": round(section.word_count / (section.generation_time_ms / 1000), 2)
                 }
@@ -1,5 +1,7 @@
+import os
 import re
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Set, Tuple
 from enum import Enum
 
 class QueryType(Enum):
@@ -7,6 +9,63 @@ class QueryType(Enum):
     SIMPLE_QUESTION = "simple_question"
     COMPLEX_QUERY = "complex_query"
 
+class QueryFeatures(NamedTuple):
+    """Everything the classifier needs from a question, extracted in one pass"""
+    text: str
+    word_count: int
+    is_greeting: bool
+    is_simple_pattern: bool
+    complexity_keyword_count: int
+    topic_indicator_count: int
+    question_word_count: int
+    period_count: int
+    question_mark_count: int
+
+class QueryAnalysis(NamedTuple):
+    query_type: QueryType
+    reasoning: str
+    estimated_sections: int
+    should_use_parallel: bool
+
+class KeywordMatcher:
+    """
+    Multi-pattern substring matcher reporting which keywords occur in a text.
+
+    A single-word keyword can only occur inside one whitespace-delimited
+    token, so matches are looked up per distinct token in a table that is
+    filled on first sight of each token. A question costs one dictionary
+    lookup per distinct token instead of one scan of the text per keyword;
+    the few multi-word keywords are still checked against the full text.
+    """
+
+    def __init__(self, keywords: Iterable[str], max_tokens: int = 65536):
+        keywords = set(keywords)
+        self.single_word_keywords = tuple(sorted(k for k in keywords if len(k.split()) == 1))
+        self.multi_word_keywords = tuple(sorted(k for k in keywords if len(k.split()) > 1))
+        self.max_tokens = max_tokens
+        self._token_matches: Dict[str, FrozenSet[str]] = {}
+
+    def _lookup(self, token: str) -> FrozenSet[str]:
+        matches = self._token_matches.get(token)
+        if matches is None:
+            if len(self._token_matches) >= self.max_tokens:
+                self._token_matches.clear()
+            matches = frozenset(keyword for keyword in self.single_word_keywords if keyword in token)
+            self._token_matches[token] = matches
+        return matches
+
+    def find(self, text: str, tokens: List[str]) -> Set[str]:
+        """Return the set of keywords that occur anywhere in text, given its tokens"""
+        try:
+            found = set().union(*map(self._token_matches.__getitem__, tokens))
+        except KeyError:
+            # First sighting of at least one token
+            found = set().union(*map(self._lookup, tokens))
+        for keyword in self.multi_word_keywords:
+            if keyword in text:
+                found.add(keyword)
+        return found
+
 class QueryClassifier:
     def __init__(self):
         # Simple greeting patterns
@@ -19,7 +78,7 @@ class QueryClassifier:
             r'^howdy\.?$',
             r'^(yo|sup)\.?$'
         ]
-        
+
         # Simple question patterns (short, non-complex)
         self.simple_question_patterns = [
             r'^what is \w+\??$',
@@ -30,7 +89,7 @@ class QueryClassifier:
             r'^what time is it\??$',
             r'^what\'?s the weather\??$'
         ]
-        
+
         # Complexity indicators
         self.complexity_keywords = [
             'explain', 'analyze', 'compare', 'describe', 'discuss',
@@ -42,52 +101,86 @@ class QueryClassifier:
             'tutorial', 'instructions', 'procedure'
         ]
 
-    def classify_query(self, question: str) -> Tuple[QueryType, str]:
+        # Topic indicators used to estimate the number of sections
+        self.topic_indicators = [
+            'and', 'also', 'additionally', 'furthermore', 'moreover',
+            'benefits', 'challenges', 'advantages', 'disadvantages',
+            'implementation', 'deployment', 'architecture', 'design',
+            'best practices', 'considerations', 'approaches', 'methods'
+        ]
+
+        # Question words that suggest complexity
+        self.complex_question_words = frozenset(['how', 'why', 'what', 'when', 'where', 'which'])
+
+        # Precompiled engine: one regex per pattern family, one keyword matcher
+        self._greeting_regex = self._compile_patterns(self.greeting_patterns)
+        self._simple_question_regex = self._compile_patterns(self.simple_question_patterns)
+        self._complexity_keyword_set = frozenset(self.complexity_keywords)
+        self._topic_indicator_set = frozenset(self.topic_indicators)
+        self._keyword_matcher = KeywordMatcher(self.complexity_keywords + self.topic_indicators)
+
+        # Memoize per question so repeated lookups within a request are free
+        cache_size = int(os.getenv("PARAGEN_CLASSIFIER_CACHE_SIZE", "4096"))
+        self._analyze_cached = lru_cache(maxsize=cache_size)(self._analyze)
+
+    def _compile_patterns(self, patterns: List[str]) -> "re.Pattern":
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+    def extract_features(self, question: str) -> QueryFeatures:
         """
-        Classify the query type and return classification with reasoning
+        Tokenize the question once and extract all classification features
         """
         question_clean = question.strip().lower()
-        
+        words = question_clean.split()
+        keywords = self._keyword_matcher.find(question_clean, words)
+
+        return QueryFeatures(
+            text=question_clean,
+            word_count=len(words),
+            is_greeting=self._greeting_regex.match(question_clean) is not None,
+            is_simple_pattern=self._simple_question_regex.match(question_clean) is not None,
+            complexity_keyword_count=len(keywords & self._complexity_keyword_set),
+            topic_indicator_count=len(keywords & self._topic_indicator_set),
+            question_word_count=sum(map(self.complex_question_words.__contains__, words)),
+            period_count=question_clean.count('.'),
+            question_mark_count=question_clean.count('?')
+        )
+
+    def classify_features(self, features: QueryFeatures) -> Tuple[QueryType, str]:
+        """
+        Classify the query type from extracted features
+        """
         # Check for simple greetings
-        for pattern in self.greeting_patterns:
-            if re.match(pattern, question_clean, re.IGNORECASE):
-                return QueryType.SIMPLE_GREETING, "Detected simple greeting pattern"
-        
+        if features.is_greeting:
+            return QueryType.SIMPLE_GREETING, "Detected simple greeting pattern"
+
         # Check for very short queries (likely simple)
-        if len(question_clean.split()) <= 3:
-            for pattern in self.simple_question_patterns:
-                if re.match(pattern, question_clean, re.IGNORECASE):
-                    return QueryType.SIMPLE_QUESTION, "Detected simple question pattern"
-            
+        if features.word_count <= 3:
+            if features.is_simple_pattern:
+                return QueryType.SIMPLE_QUESTION, "Detected simple question pattern"
+
             # If it's very short but not a recognized pattern, still treat as simple
-            if len(question_clean.split()) <= 2:
+            if features.word_count <= 2:
                 return QueryType.SIMPLE_QUESTION, "Very short query, treating as simple"
-        
+
         # Check for complexity indicators
-        complexity_score = 0
-        words = question_clean.split()
-        
-        for keyword in self.complexity_keywords:
-            if keyword in question_clean:
-                complexity_score += 1
-        
+        complexity_score = features.complexity_keyword_count
+
         # Length-based complexity
-        word_count = len(words)
+        word_count = features.word_count
         if word_count > 15:
             complexity_score += 1
         if word_count > 25:
             complexity_score += 2
-        
+
         # Question words that suggest complexity
-        complex_question_words = ['how', 'why', 'what', 'when', 'where', 'which']
-        question_word_count = sum(1 for word in words if word in complex_question_words)
-        if question_word_count > 1:
+        if features.question_word_count > 1:
             complexity_score += 1
-        
+
         # Multiple sentences suggest complexity
-        if len(question.split('.')) > 2 or len(question.split('?')) > 2:
+        if features.period_count > 1 or features.question_mark_count > 1:
             complexity_score += 1
-        
+
         if complexity_score >= 1:  # Lowered threshold - if any complexity indicator is found
             return QueryType.COMPLEX_QUERY, f"Complexity score: {complexity_score}"
         elif word_count > 6:  # Lowered length threshold for medium queries
@@ -95,38 +188,57 @@ class QueryClassifier:
         else:
             return QueryType.SIMPLE_QUESTION, "Short query without complexity indicators"
 
+    def _analyze(self, question: str) -> QueryAnalysis:
+        features = self.extract_features(question)
+        query_type, reasoning = self.classify_features(features)
+
+        if query_type != QueryType.COMPLEX_QUERY:
+            estimated_sections = 1
+        else:
+            # Base sections + topic indicators
+            estimated_sections = max(3, min(6, 3 + features.topic_indicator_count))
+
+        return QueryAnalysis(
+            query_type=query_type,
+            reasoning=reasoning,
+            estimated_sections=estimated_sections,
+            should_use_parallel=query_type == QueryType.COMPLEX_QUERY
+        )
+
+    def analyze(self, question: str) -> QueryAnalysis:
+        """
+        Classify the query, estimate sections and recommend an approach in one pass
+        """
+        return self._analyze_cached(question)
+
+    def analyze_batch(self, questions: List[str]) -> List[QueryAnalysis]:
+        """
+        Analyze many questions at once; duplicates within the batch are analyzed once
+        """
+        results: Dict[str, QueryAnalysis] = {}
+        for question in questions:
+            if question not in results:
+                results[question] = self._analyze(question)
+        return [results[question] for question in questions]
+
+    def classify_query(self, question: str) -> Tuple[QueryType, str]:
+        """
+        Classify the query type and return classification with reasoning
+        """
+        analysis = self.analyze(question)
+        return analysis.query_type, analysis.reasoning
+
     def should_use_parallel_generation(self, question: str) -> bool:
         """
         Determine if parallel generation is worth using for this query
         """
-        query_type, _ = self.classify_query(question)
-        return query_type == QueryType.COMPLEX_QUERY
+        return self.analyze(question).should_use_parallel
 
     def estimate_sections_needed(self, question: str) -> int:
         """
         Estimate how many sections a complex query might need
         """
-        query_type, _ = self.classify_query(question)
-        
-        if query_type != QueryType.COMPLEX_QUERY:
-            return 1
-        
-        question_lower = question.lower()
-        
-        # Count topic indicators
-        topic_indicators = [
-            'and', 'also', 'additionally', 'furthermore', 'moreover',
-            'benefits', 'challenges', 'advantages', 'disadvantages',
-            'implementation', 'deployment', 'architecture', 'design',
-            'best practices', 'considerations', 'approaches', 'methods'
-        ]
-        
-        topic_count = sum(1 for indicator in topic_indicators if indicator in question_lower)
-        
-        # Base sections + topic indicators
-        estimated_sections = max(3, min(6, 3 + topic_count))
-        
-        return estimated_sections
+        return self.analyze(question).estimated_sections
 
 # Global instance
-query_classifier = QueryClassifier()
\ No newline at end of file
+query_classifier = QueryClassifier()
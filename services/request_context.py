@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from models.schemas import RequestPriority
+
+class RequestContext:
+    """Per-request attributes that LLM calls need but that are not passed explicitly"""
+
+    def __init__(
+        self,
+        priority: RequestPriority = RequestPriority.STANDARD,
+        tenant_id: Optional[str] = None,
+        parent: Optional["RequestContext"] = None
+    ):
+        self.priority = priority
+        self.tenant_id = tenant_id or "anonymous"
+        self.parent = parent
+        # Token usage of every LLM call made for the request
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add_usage(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+        """Accumulate token usage reported for one LLM call"""
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+        if self.parent is not None:
+            self.parent.add_usage(prompt_tokens, completion_tokens)
+
+    def child(self) -> "RequestContext":
+        """New context with the same scheduling attributes and its own usage counters"""
+        return RequestContext(priority=self.priority, tenant_id=self.tenant_id, parent=self)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+_DEFAULT_CONTEXT = RequestContext()
+
+# Tasks spawned with asyncio.gather/create_task inherit the context of their
+# parent, so every section call of a request sees the request's context
+_current_context: ContextVar[RequestContext] = ContextVar("paragen_request_context", default=_DEFAULT_CONTEXT)
+
+def get_request_context() -> RequestContext:
+    """Return the context of the request being served"""
+    return _current_context.get()
+
+def set_request_context(context: RequestContext) -> RequestContext:
+    """Bind a context to the current task and the tasks it spawns"""
+    _current_context.set(context)
+    return context
+
+@contextmanager
+def child_context() -> Iterator[RequestContext]:
+    """Run a block under a child context whose usage also counts toward the current one"""
+    context = get_request_context().child()
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_context.reset(token)
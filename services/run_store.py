@@ -0,0 +1,331 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Dict, List, Optional, TypeVar, Union
+from models.schemas import (
+    GenerationStrategy,
+    LongFormResponse,
+    ParallelResponse,
+    SequentialResponse
+)
+from services.metrics import summarize_latencies
+from services.request_context import RequestContext, child_context
+
+logger = logging.getLogger(__name__)
+
+ResponseT = TypeVar("ResponseT", SequentialResponse, ParallelResponse, LongFormResponse)
+
+GROUP_BY_COLUMNS = {
+    "strategy": "strategy",
+    "section_count": "section_count",
+    "hour": "strftime('%Y-%m-%dT%H:00', created_at, 'unixepoch')",
+    "outcome": "outcome"
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    question_hash TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    error TEXT,
+    priority TEXT,
+    tenant_id TEXT,
+    total_time_ms REAL,
+    identification_time_ms REAL,
+    generation_time_ms REAL,
+    section_count INTEGER,
+    word_count INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    plan TEXT,
+    sections TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs (created_at);
+"""
+
+_INSERT = """
+INSERT INTO runs (
+    created_at, question_hash, strategy, outcome, error, priority, tenant_id,
+    total_time_ms, identification_time_ms, generation_time_ms, section_count,
+    word_count, prompt_tokens, completion_tokens, plan, sections
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+class RunStore:
+    """
+    Append-only history of every generation run, kept in SQLite (WAL mode).
+
+    Recording only appends a reference to the finished response to an
+    in-memory buffer; hashing, serialization and batched inserts happen on a
+    background writer thread that drains the buffer every flush interval, so
+    the request path pays a couple of microseconds per run.
+    """
+
+    def __init__(self):
+        self.path = os.getenv("PARAGEN_RUN_STORE_PATH", "paragen_runs.db")
+        self.batch_size = int(os.getenv("PARAGEN_RUN_STORE_BATCH_SIZE", "256"))
+        self.flush_interval_s = float(os.getenv("PARAGEN_RUN_STORE_FLUSH_INTERVAL_S", "1.0"))
+        self.enabled = bool(self.path)
+
+        self.max_pending = int(os.getenv("PARAGEN_RUN_STORE_MAX_PENDING", "100000"))
+
+        self._pending: deque = deque()
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.dropped = 0
+        self.written = 0
+        # Set when the database cannot be opened; the store then drops every run
+        self.error: Optional[str] = None
+
+    async def track(
+        self,
+        question: str,
+        strategy: GenerationStrategy,
+        generation: Awaitable[ResponseT]
+    ) -> ResponseT:
+        """
+        Await a generation under its own usage context, stamp the token usage
+        on the response and record the run
+        """
+        with child_context() as context:
+            start_time = time.time()
+            try:
+                response = await generation
+            except Exception as e:
+                self.record_failure(question, strategy, e, (time.time() - start_time) * 1000, context)
+                raise
+
+            response.prompt_tokens = context.prompt_tokens
+            response.completion_tokens = context.completion_tokens
+            self.record_response(question, strategy, response, context)
+            return response
+
+    def record_response(
+        self,
+        question: str,
+        strategy: GenerationStrategy,
+        response: Union[SequentialResponse, ParallelResponse, LongFormResponse],
+        context: RequestContext
+    ) -> None:
+        """Record a completed run; runs that salvaged failed sections are recorded as partial"""
+        outcome = "partial" if getattr(response, "partial", False) else "ok"
+        self._enqueue((
+            time.time(), question, strategy.value, outcome, None, response, None,
+            context.priority.value, context.tenant_id,
+            context.prompt_tokens, context.completion_tokens
+        ))
+
+    def record_failure(
+        self,
+        question: str,
+        strategy: GenerationStrategy,
+        error: Exception,
+        elapsed_ms: float,
+        context: RequestContext
+    ) -> None:
+        """Record a run that raised"""
+        self._enqueue((
+            time.time(), question, strategy.value, "error", str(error), None, elapsed_ms,
+            context.priority.value, context.tenant_id,
+            context.prompt_tokens, context.completion_tokens
+        ))
+
+    def query_aggregates(self, hours: float = 24, group_by: str = "strategy") -> dict:
+        """Latency percentiles, error rates and token usage per group over a time window"""
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY_COLUMNS)}")
+        if not self.enabled:
+            return {"window_hours": hours, "group_by": group_by, "groups": []}
+
+        since = (datetime.now() - timedelta(hours=hours)).timestamp()
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f"SELECT {GROUP_BY_COLUMNS[group_by]}, outcome, total_time_ms, identification_time_ms, "
+                "prompt_tokens, completion_tokens FROM runs WHERE created_at >= ?",
+                (since,)
+            ).fetchall()
+        finally:
+            connection.close()
+
+        groups: Dict[object, List[tuple]] = {}
+        for row in rows:
+            groups.setdefault(row[0], []).append(row[1:])
+
+        return {
+            "window_hours": hours,
+            "group_by": group_by,
+            "groups": [
+                self._aggregate(key, group_rows)
+                for key, group_rows in sorted(groups.items(), key=lambda item: str(item[0]))
+            ]
+        }
+
+    def close(self) -> None:
+        """Flush pending runs and stop the writer thread"""
+        with self._lock:
+            self._closed = True
+            writer = self._writer
+        if writer is not None:
+            self._stop.set()
+            writer.join(timeout=10)
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "error": self.error,
+            "path": self.path,
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped
+        }
+
+    def _aggregate(self, key, rows: List[tuple]) -> dict:
+        ok_rows = [row for row in rows if row[0] != "error"]
+        partial_runs = sum(1 for row in ok_rows if row[0] == "partial")
+        return {
+            "key": key,
+            "runs": len(rows),
+            "errors": len(rows) - len(ok_rows),
+            "error_rate": round((len(rows) - len(ok_rows)) / len(rows), 4),
+            "partial": partial_runs,
+            "partial_rate": round(partial_runs / len(rows), 4),
+            "total_time": summarize_latencies(row[1] for row in ok_rows if row[1] is not None),
+            "identification_time": summarize_latencies(row[2] for row in ok_rows if row[2] is not None),
+            "avg_prompt_tokens": round(sum(row[3] or 0 for row in rows) / len(rows), 1),
+            "avg_completion_tokens": round(sum(row[4] or 0 for row in rows) / len(rows), 1)
+        }
+
+    def _enqueue(self, item: tuple) -> None:
+        if self.error is not None:
+            self.dropped += 1
+            return
+        if not self.enabled or self._closed:
+            return
+        if self._writer is None:
+            self._start_writer()
+        if len(self._pending) >= self.max_pending:
+            # Never block a request on the history store
+            self.dropped += 1
+            return
+        self._pending.append(item)
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is None and not self._closed:
+                self._writer = threading.Thread(target=self._run_writer, name="paragen-run-store", daemon=True)
+                self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        # Readers may connect before the writer has created the table
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _run_writer(self) -> None:
+        try:
+            connection = self._connect()
+        except Exception as e:
+            self._fail(e)
+            return
+
+        while True:
+            stopping = self._stop.wait(self.flush_interval_s)
+
+            # deque.popleft is atomic, so draining needs no lock against appenders
+            while self._pending:
+                rows = []
+                while self._pending and len(rows) < self.batch_size:
+                    item = self._pending.popleft()
+                    try:
+                        rows.append(self._to_row(item))
+                    except Exception:
+                        # One malformed run must not stop the writer
+                        self.dropped += 1
+                try:
+                    connection.executemany(_INSERT, rows)
+                    connection.commit()
+                    self.written += len(rows)
+                except Exception:
+                    self.dropped += len(rows)
+
+            if stopping:
+                break
+
+        connection.close()
+
+    def _fail(self, error: Exception) -> None:
+        """Stop recording after the database could not be opened"""
+        self.error = str(error)
+        self.enabled = False
+        logger.error("Run store disabled: cannot open %s: %s", self.path, error)
+        while self._pending:
+            self._pending.popleft()
+            self.dropped += 1
+
+    def _to_row(self, item: tuple) -> tuple:
+        (created_at, question, strategy, outcome, error, response, elapsed_ms,
+         priority, tenant_id, prompt_tokens, completion_tokens) = item
+        question_hash = hashlib.sha256(question.encode("utf-8")).hexdigest()[:16]
+
+        identification_time_ms = None
+        generation_time_ms = None
+        section_count = None
+        word_count = None
+        plan = None
+        sections = None
+
+        if isinstance(response, SequentialResponse):
+            elapsed_ms = response.generation_time_ms
+            generation_time_ms = response.generation_time_ms
+            word_count = response.word_count
+        elif isinstance(response, ParallelResponse):
+            elapsed_ms = response.total_generation_time_ms
+            identification_time_ms = response.section_identification_time_ms
+            generation_time_ms = response.parallel_generation_time_ms
+            section_count = len(response.sections)
+            word_count = response.word_count
+            if isinstance(response, LongFormResponse):
+                plan = json.dumps([node.dict() for node in response.plan])
+            else:
+                plan = json.dumps([
+                    {"section_heading": section.heading, "section_content_size_in_words": section.target_words}
+                    for section in response.sections
+                ])
+            sections = json.dumps([
+                {
+                    "heading": section.heading,
+                    "section_number": section.section_number,
+                    "target_words": section.target_words,
+                    "word_count": section.word_count,
+                    "generation_time_ms": round(section.generation_time_ms, 2),
+                    "truncated": section.truncated,
+                    "prompt_tokens": section.prompt_tokens,
+                    "completion_tokens": section.completion_tokens,
+                    "model": section.model,
+                    "retries": section.retries,
+                    "failed": section.failed
+                }
+                for section in response.sections
+            ])
+
+        return (
+            created_at, question_hash, strategy, outcome, error, priority, tenant_id,
+            elapsed_ms, identification_time_ms, generation_time_ms, section_count,
+            word_count, prompt_tokens, completion_tokens, plan, sections
+        )
+
+# Global instance
+run_store = RunStore()
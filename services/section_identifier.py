@@ -1,60 +1,116 @@
 import csv
 import io
 import time
+from typing import List, Optional
 from models.schemas import SectionInfo, SectionIdentificationResponse
-from services.openai_client import get_openai_client
-from prompts.section_prompts import SECTION_IDENTIFICATION_PROMPT
+from services.openai_client import get_openai_client, ModelStage
+from prompts.section_prompts import (
+    SECTION_IDENTIFICATION_PROMPT,
+    LONG_FORM_SECTION_IDENTIFICATION_PROMPT,
+    SUBSECTION_IDENTIFICATION_PROMPT
+)
 
 class SectionIdentifier:
     def __init__(self):
         pass
 
-    async def identify_sections(self, question: str) -> SectionIdentificationResponse:
+    async def identify_sections(
+        self,
+        question: str,
+        target_words: Optional[int] = None
+    ) -> SectionIdentificationResponse:
         """
-        Identify logical sections for the given question using LLM
+        Identify logical sections for the given question using LLM.
+        When target_words is given, plan the top level of a long-form document.
         """
         start_time = time.time()
-        
-        prompt = SECTION_IDENTIFICATION_PROMPT.format(question=question)
-        
+
+        if target_words:
+            prompt = LONG_FORM_SECTION_IDENTIFICATION_PROMPT.format(
+                question=question,
+                target_words=target_words
+            )
+        else:
+            prompt = SECTION_IDENTIFICATION_PROMPT.format(question=question)
+
         try:
             response = await get_openai_client().generate_completion(
                 prompt=prompt,
                 max_tokens=800,
-                temperature=0.3
+                temperature=0.3,
+                stage=ModelStage.IDENTIFICATION
             )
-            
-            # Parse CSV response
-            csv_data = response.strip()
-            sections = []
-            
-            # Use StringIO to read CSV from string
-            csv_reader = csv.reader(io.StringIO(csv_data))
-            
-            for row in csv_reader:
-                if len(row) >= 2:  # Ensure we have both heading and word count
-                    try:
-                        section_heading = row[0].strip()
-                        word_count = int(row[1].strip())
-                        
-                        sections.append(SectionInfo(
-                            section_heading=section_heading,
-                            section_content_size_in_words=word_count
-                        ))
-                    except (ValueError, IndexError) as e:
-                        # Skip malformed rows
-                        continue
-            
+
+            sections = self._parse_sections(response)
+
             if not sections:
                 raise Exception("No valid sections found in CSV response")
-            
+
             end_time = time.time()
             identification_time = (end_time - start_time) * 1000
-            
+
             return SectionIdentificationResponse(sections=sections), identification_time
-            
+
         except Exception as e:
             raise Exception(f"Section identification failed: {str(e)}")
 
+    async def identify_subsections(
+        self,
+        question: str,
+        section_heading: str,
+        target_words: int
+    ) -> List[SectionInfo]:
+        """
+        Break a single section into subsections for long-form generation
+        """
+        prompt = SUBSECTION_IDENTIFICATION_PROMPT.format(
+            question=question,
+            section_heading=section_heading,
+            target_words=target_words
+        )
+
+        try:
+            response = await get_openai_client().generate_completion(
+                prompt=prompt,
+                max_tokens=800,
+                temperature=0.3,
+                stage=ModelStage.IDENTIFICATION
+            )
+
+            sections = self._parse_sections(response)
+
+            if not sections:
+                raise Exception("No valid subsections found in CSV response")
+
+            return sections
+
+        except Exception as e:
+            raise Exception(f"Subsection identification for '{section_heading}' failed: {str(e)}")
+
+    def _parse_sections(self, response: str) -> List[SectionInfo]:
+        """Parse a heading,word_count CSV response into sections"""
+        # Parse CSV response
+        csv_data = response.strip()
+        sections = []
+
+        # Use StringIO to read CSV from string
+        csv_reader = csv.reader(io.StringIO(csv_data))
+
+        for row in csv_reader:
+            if len(row) >= 2:  # Ensure we have both heading and word count
+                try:
+                    section_heading = row[0].strip()
+                    word_count = int(row[1].strip())
+
+                    sections.append(SectionInfo(
+                        section_heading=section_heading,
+                        section_content_size_in_words=word_count
+                    ))
+                except (ValueError, IndexError) as e:
+                    # Skip malformed rows
+                    continue
+
+        return sections
+
 # Global instance
-section_identifier = SectionIdentifier()
\ No newline at end of file
+section_identifier = SectionIdentifier()
@@ -0,0 +1,88 @@
+import os
+import random
+import threading
+
+class RetryBudget:
+    """Retries one request may spend across all of its sections"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.remaining = total
+
+    def try_spend(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+    @property
+    def spent(self) -> int:
+        return self.total - self.remaining
+
+class SectionRetryPolicy:
+    """Per-section retries with full-jitter exponential backoff, capped per request"""
+
+    def __init__(self):
+        self.max_retries = int(os.getenv("PARAGEN_SECTION_MAX_RETRIES", "2"))
+        self.request_budget = int(os.getenv("PARAGEN_REQUEST_RETRY_BUDGET", "4"))
+        self.base_delay_s = float(os.getenv("PARAGEN_SECTION_RETRY_BASE_DELAY_S", "0.5"))
+        self.max_delay_s = float(os.getenv("PARAGEN_SECTION_RETRY_MAX_DELAY_S", "8"))
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.salvaged_requests = 0
+        self.failed_requests = 0
+        self.section_attempts = 0
+        self.section_retries = 0
+        self.recovered_sections = 0
+        self.failed_sections = 0
+        self.budget_exhausted = 0
+
+    def new_budget(self) -> RetryBudget:
+        return RetryBudget(self.request_budget)
+
+    def backoff_delay(self, retry: int) -> float:
+        """Seconds to wait before the given retry (1-based)"""
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** (retry - 1))))
+
+    def record_section(self, attempts: int, failed: bool, budget_exhausted: bool = False) -> None:
+        with self._lock:
+            self.section_attempts += attempts
+            self.section_retries += attempts - 1
+            if failed:
+                self.failed_sections += 1
+            elif attempts > 1:
+                self.recovered_sections += 1
+            if budget_exhausted:
+                self.budget_exhausted += 1
+
+    def record_request(self, failed_sections: int, section_count: int) -> None:
+        with self._lock:
+            self.requests += 1
+            if failed_sections == section_count:
+                self.failed_requests += 1
+            elif failed_sections:
+                self.salvaged_requests += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "config": {
+                    "max_retries_per_section": self.max_retries,
+                    "retry_budget_per_request": self.request_budget,
+                    "base_delay_s": self.base_delay_s,
+                    "max_delay_s": self.max_delay_s
+                },
+                "requests": self.requests,
+                "salvaged_requests": self.salvaged_requests,
+                "salvaged_rate": round(self.salvaged_requests / self.requests, 4) if self.requests else 0.0,
+                "failed_requests": self.failed_requests,
+                "section_attempts": self.section_attempts,
+                "section_retries": self.section_retries,
+                "recovered_sections": self.recovered_sections,
+                "failed_sections": self.failed_sections,
+                "retry_budget_exhausted": self.budget_exhausted
+            }
+
+# Global instance
+section_retry_policy = SectionRetryPolicy()
@@ -1,6 +1,7 @@
 import time
-from models.schemas import SequentialResponse
-from services.openai_client import get_openai_client
+from models.schemas import SequentialResponse, GenerationStrategy
+from services.openai_client import get_openai_client, ModelStage
+from services.run_store import run_store
 from prompts.section_prompts import SEQUENTIAL_GENERATION_PROMPT
 from datetime import datetime
 
@@ -10,6 +11,13 @@ class SequentialGenerator:
 
     async def generate_sequential_response(self, question: str) -> SequentialResponse:
         """Generate a complete response using traditional sequential approach"""
+        return await run_store.track(
+            question,
+            GenerationStrategy.SEQUENTIAL,
+            self._generate_sequential_response(question)
+        )
+
+    async def _generate_sequential_response(self, question: str) -> SequentialResponse:
         start_time = time.time()
         
         prompt = SEQUENTIAL_GENERATION_PROMPT.format(question=question)
@@ -18,7 +26,8 @@ class SequentialGenerator:
             content = await get_openai_client().generate_completion(
                 prompt=prompt,
                 max_tokens=2000,
-                temperature=0.7
+                temperature=0.7,
+                stage=ModelStage.SEQUENTIAL
             )
             
             end_time = time.time()
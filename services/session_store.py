@@ -0,0 +1,90 @@
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+from models.schemas import ParallelResponse
+
+class Session:
+    """A generated parallel response kept for section-level regeneration"""
+
+    def __init__(self, session_id: str, question: str, response: ParallelResponse):
+        self.session_id = session_id
+        self.question = question
+        self.response = response
+        self.created_at = time.monotonic()
+        self.last_access = self.created_at
+        # What regenerating the whole response would cost, for reporting savings
+        self.full_generation_time_ms = response.total_generation_time_ms
+        self.full_generation_tokens = response.prompt_tokens + response.completion_tokens
+        self.regenerations = 0
+
+class SessionStore:
+    """
+    Bounded in-memory store of parallel responses by session id.
+
+    Sessions are evicted least recently used once the store is full and
+    expire after a fixed time to live.
+    """
+
+    def __init__(self):
+        self.max_sessions = int(os.getenv("PARAGEN_SESSION_STORE_SIZE", "1000"))
+        self.ttl_s = float(os.getenv("PARAGEN_SESSION_TTL_S", "3600"))
+        self.enabled = self.max_sessions > 0
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.regenerations = 0
+
+    def save(self, question: str, response: ParallelResponse) -> Optional[str]:
+        """Store a response and return its session id"""
+        if not self.enabled:
+            return None
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = Session(session_id, question, response)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """Return a live session and mark it recently used"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        if now - session.created_at > self.ttl_s:
+            del self._sessions[session_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        session.last_access = now
+        self._sessions.move_to_end(session_id)
+        self.hits += 1
+        return session
+
+    def record_regeneration(self, session: Session) -> None:
+        session.regenerations += 1
+        self.regenerations += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "regenerations": self.regenerations
+        }
+
+# Global instance
+session_store = SessionStore()
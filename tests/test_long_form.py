@@ -0,0 +1,8 @@
+from services.parallel_generator import ParallelGenerator
+
+def test_subsection_sizes_add_up_to_parent():
+    assert ParallelGenerator._scale_sizes([100, 200, 300], 1200) == [200, 400, 600]
+    assert sum(ParallelGenerator._scale_sizes([333, 333, 334], 1000)) == 1000
+
+def test_subsection_sizes_without_estimates_split_evenly():
+    assert ParallelGenerator._scale_sizes([0, 0, 0], 10) == [4, 3, 3]
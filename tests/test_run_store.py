@@ -0,0 +1,7 @@
+from services.run_store import RunStore
+
+def test_query_before_any_run_returns_no_groups(tmp_path, monkeypatch):
+    monkeypatch.setenv("PARAGEN_RUN_STORE_PATH", str(tmp_path / "runs.db"))
+    store = RunStore()
+
+    assert store.query_aggregates(hours=1)["groups"] == []
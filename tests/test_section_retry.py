@@ -0,0 +1,56 @@
+import asyncio
+import httpx
+import pytest
+from openai import APIConnectionError
+from benchmarks import fake_llm
+from models.schemas import SectionInfo
+from services.parallel_generator import parallel_generator
+from services.section_retry import RetryBudget
+
+class DisconnectingStream(fake_llm.FakeStream):
+    """Stream that drops the connection after a few chunks"""
+
+    async def __anext__(self):
+        if self._index == 3:
+            raise httpx.ReadError("peer closed connection without sending complete message body")
+        return await super().__anext__()
+
+@pytest.fixture
+def completions(monkeypatch):
+    completions = fake_llm.install()
+    monkeypatch.setattr(parallel_generator.retry_policy, "base_delay_s", 0.0)
+    return completions
+
+def disconnect_first_attempts(monkeypatch, completions, failures):
+    create = completions.create
+
+    async def flaky_create(*args, **kwargs):
+        stream = await create(*args, **kwargs)
+        if kwargs.get("stream") and completions.calls <= failures:
+            return DisconnectingStream(stream._words, stream._usage)
+        return stream
+
+    monkeypatch.setattr(completions, "create", flaky_create)
+
+def test_mid_stream_disconnect_is_connection_error(monkeypatch, completions):
+    disconnect_first_attempts(monkeypatch, completions, failures=1)
+    client = fake_llm.openai_client_module.openai_client
+
+    with pytest.raises(Exception) as info:
+        asyncio.run(client.stream_completion("Write a section"))
+
+    assert isinstance(info.value.__cause__, APIConnectionError)
+    assert isinstance(info.value.__cause__.__cause__, httpx.ReadError)
+
+def test_mid_stream_disconnect_retries_section(monkeypatch, completions):
+    disconnect_first_attempts(monkeypatch, completions, failures=1)
+    section = SectionInfo(section_heading="Core Concepts", section_content_size_in_words=100)
+
+    generated = asyncio.run(parallel_generator.generate_section_with_retries(
+        "Explain Kubernetes", section, RetryBudget(4), section_index=0
+    ))
+
+    assert not generated.failed
+    assert generated.retries == 1
+    assert generated.word_count > 0
+    assert completions.calls == 2